@@ -1,12 +1,96 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    READ_REPLICA_URL: Optional[str] = None
     SECRET_KEY: str
     ALGORITHM: str = "HS256" 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Rotated on every POST /token/refresh; expired ones are purged periodically (0 = never).
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
     POSTGRES_PASSWORD: str
 
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARM: int = 10  # connections opened per engine at startup
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = server default
+
+    # Route handlers are plain `def`, so FastAPI runs them (and their blocking
+    # DB calls) on this thread pool instead of the event loop.
+    THREADPOOL_SIZE: int = 40
+
+    # Password hashing runs on a dedicated executor: "process", "thread" or "inline".
+    BCRYPT_ROUNDS: int = 12
+    HASH_EXECUTOR: str = "process"
+    HASH_WORKERS: int = 0  # 0 = one worker per CPU core
+    HASH_QUEUE_SIZE: int = 64
+    HASH_RETRY_AFTER_SECONDS: int = 1
+
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Roles are cached in memory; an unknown role name or id reloads them at most this often.
+    ROLE_REGISTRY_RELOAD_SECONDS: int = 60
+
+    # How often the stat counters are rebuilt from source tables; 0 disables it.
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 3600
+    # Rows each counter is spread over, so concurrent writes rarely wait on the same row lock.
+    STATS_COUNTER_SLOTS: int = 16
+
+    # Serialized /tasks/{id}, /my-tasks and /my-tasks/summary responses, invalidated per
+    # owner on writes. Per process unless TaskCache.configure() sets a shared backend.
+    TASK_CACHE_SIZE: int = 50000
+    TASK_CACHE_TTL_SECONDS: int = 30
+
+    TASK_BATCH_MAX_ITEMS: int = 2000
+
+    # DONE tasks untouched for this long move to archived_tasks (0 = never). The
+    # job also sweeps up tasks of archived users; an interval of 0 disables it.
+    TASK_ARCHIVE_AFTER_DAYS: int = 90
+    TASK_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    TASK_ARCHIVE_BATCH_SIZE: int = 1000  # rows moved per transaction
+
+    # Due-date reminders and overdue events. One worker at a time (Postgres advisory
+    # lock TASK_DUE_LOCK_KEY) keeps the deadlines of the next TASK_DUE_LOOKAHEAD_SECONDS
+    # in memory, reloading them every TASK_DUE_POLL_SECONDS (0 disables the scheduler).
+    # Events go to TASK_DUE_SINK: "events" (the change feed), "log" or "memory".
+    TASK_DUE_POLL_SECONDS: int = 60
+    TASK_DUE_LOOKAHEAD_SECONDS: int = 300
+    TASK_DUE_REMINDER_MINUTES: int = 60  # 0 = overdue events only
+    TASK_DUE_BATCH_SIZE: int = 1000
+    TASK_DUE_MAX_PENDING: int = 100000
+    TASK_DUE_SINK: str = "events"
+    TASK_DUE_LOCK_KEY: int = 72140001
+
+    # Change feed: "memory" (single process) or "postgres" (LISTEN/NOTIFY across workers).
+    TASK_EVENTS_BACKEND: str = "memory"
+    TASK_EVENTS_CHANNEL: str = "task_events"
+    TASK_EVENTS_BUFFER_SIZE: int = 10000  # recent events kept for Last-Event-ID resume
+    TASK_EVENTS_QUEUE_SIZE: int = 1000  # per subscriber, before it is resynced
+    TASK_EVENTS_KEEPALIVE_SECONDS: int = 15
+    TASK_EVENTS_RETRY_MS: int = 3000
+
+    # Bulk imports: rows validated and loaded per transaction, jobs run at once,
+    # rejected rows kept per import, and where uploads are spooled (None = system temp dir).
+    TASK_IMPORT_CHUNK_SIZE: int = 5000
+    TASK_IMPORT_WORKERS: int = 2
+    TASK_IMPORT_MAX_ERRORS: int = 1000
+    TASK_IMPORT_DIR: Optional[str] = None
+    # At startup, imports PENDING or RUNNING with no progress for this long are marked FAILED.
+    TASK_IMPORT_STALE_SECONDS: int = 900
+
+    # Rows fetched from the server-side cursor and flushed per chunk by exports.
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_MS: int = 200
+    SERVER_TIMING_ENABLED: bool = False
+
     model_config = SettingsConfigDict(env_file=".env",
         extra="ignore")
 
@@ -0,0 +1,78 @@
+import heapq
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+logger=logging.getLogger(__name__)
+
+REMINDER="reminder"
+OVERDUE="overdue"
+
+
+@dataclass(frozen=True, order=True)
+class Deadline:
+    """A reminder or overdue event for one task, due at `fire_at` (naive UTC)."""
+    fire_at: datetime
+    kind: str
+    task_id: int
+    owner_id: Optional[int]=field(compare=False)
+    due_date: datetime=field(compare=False)
+
+
+class TimerHeap:
+    """Deadlines ordered by fire time; each (kind, task) is held at most once."""
+
+    def __init__(self):
+        self._heap: list[Deadline]=[]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def replace(self, deadlines: list[Deadline]) -> None:
+        unique={(deadline.kind, deadline.task_id): deadline for deadline in deadlines}
+        self._heap=list(unique.values())
+        heapq.heapify(self._heap)
+
+    def next_at(self) -> Optional[datetime]:
+        return self._heap[0].fire_at if self._heap else None
+
+    def pop_due(self, now: datetime, limit: int) -> list[Deadline]:
+        """Up to `limit` deadlines with fire_at <= now, earliest first."""
+        due=[]
+        while self._heap and len(due) < limit and self._heap[0].fire_at <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+
+class DeadlineSink:
+    """Receives fired deadlines; implementations must not block for long."""
+
+    def emit(self, deadlines: list[Deadline]) -> None:
+        raise NotImplementedError
+
+
+class LogSink(DeadlineSink):
+    def emit(self, deadlines: list[Deadline]) -> None:
+        for deadline in deadlines:
+            logger.info("Task %d %s (due %s)", deadline.task_id, deadline.kind, deadline.due_date.isoformat())
+
+
+class MemorySink(DeadlineSink):
+    """Keeps the most recent deadlines in memory, for tests and local runs."""
+
+    def __init__(self, maxlen: int = 10000):
+        self._lock=threading.Lock()
+        self._deadlines: deque[Deadline]=deque(maxlen=maxlen)
+
+    def emit(self, deadlines: list[Deadline]) -> None:
+        with self._lock:
+            self._deadlines.extend(deadlines)
+
+    def drain(self) -> list[Deadline]:
+        with self._lock:
+            deadlines=list(self._deadlines)
+            self._deadlines.clear()
+        return deadlines
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import uuid
+from collections import deque
+from typing import Callable, Iterable, Optional
+from sqlalchemy import func, select as sql_select
+from sqlalchemy.engine import Engine
+from app.core import metrics
+
+logger=logging.getLogger(__name__)
+
+subscribers_gauge=metrics.Gauge("event_subscribers", "Open change-feed subscriptions.")
+overflows=metrics.Counter("event_subscriber_overflows_total", "Subscriptions that fell too far behind and were resynced.")
+
+# NOTIFY payloads are limited to 8000 bytes; events are packed into JSON arrays below that.
+NOTIFY_PAYLOAD_LIMIT=7500
+
+
+class Overflowed(Exception):
+    """The subscriber fell behind by more than its queue size."""
+
+
+class Subscription:
+    """One consumer's bounded view of the feed.
+
+    Events are handed over on the consumer's event loop. When more than
+    `maxsize` events are waiting, the subscription is detached instead of
+    growing without bound; the consumer then resumes from the broker's
+    ring buffer using the last id it delivered.
+    """
+
+    def __init__(self, broker: "EventBroker", match: Callable[[dict], bool], maxsize: int):
+        self.broker=broker
+        self.match=match
+        self.maxsize=maxsize
+        self.loop=asyncio.get_running_loop()
+        self.pending: deque[tuple[str, dict]]=deque()
+        self.overflowed=False
+        self._ready=asyncio.Event()
+
+    def _deliver(self, event_id: str, event: dict) -> None:
+        if self.overflowed:
+            return
+        if len(self.pending) >= self.maxsize:
+            self.overflowed=True
+            overflows.inc()
+            self.broker.unsubscribe(self)
+        else:
+            self.pending.append((event_id, event))
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[tuple[str, dict]]:
+        """The next (id, event), or None after `timeout` seconds without one."""
+        if not self.pending and not self.overflowed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.pending:
+            return self.pending.popleft()
+        raise Overflowed()
+
+
+class EventBroker:
+    """In-process fan-out with a ring buffer of recent events for resuming.
+
+    Event ids are "<epoch>-<seq>", where the epoch identifies this broker
+    instance. An id from another epoch (a restart, or a different worker)
+    or one that has already left the buffer cannot be resumed from, and the
+    subscriber is told to resync instead.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int):
+        self.epoch=uuid.uuid4().hex[:8]
+        self.queue_size=queue_size
+        self._seq=0
+        self._buffer: deque[tuple[int, dict]]=deque(maxlen=buffer_size)
+        self._subscriptions: set[Subscription]=set()
+        self._lock=threading.Lock()
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _parse_id(self, event_id: Optional[str]) -> Optional[int]:
+        epoch, _, seq=(event_id or "").partition("-")
+        if epoch!=self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def dispatch(self, events: Iterable[dict]) -> None:
+        """Number, buffer and fan out events. Safe to call from any thread."""
+        with self._lock:
+            numbered=[]
+            for event in events:
+                self._seq+=1
+                self._buffer.append((self._seq, event))
+                numbered.append((self._event_id(self._seq), event))
+            subscriptions=list(self._subscriptions)
+
+        for subscription in subscriptions:
+            try:
+                for event_id, event in numbered:
+                    if subscription.match(event):
+                        subscription.loop.call_soon_threadsafe(subscription._deliver, event_id, event)
+            except RuntimeError:
+                # The subscriber's loop is closed (a client gone before its
+                # cleanup ran). Publishing follows a committed write, so drop
+                # the subscription instead of failing the publisher.
+                self.unsubscribe(subscription)
+
+    def subscribe(self, match: Callable[[dict], bool], last_event_id: Optional[str] = None) -> tuple[Subscription, bool]:
+        """Open a subscription, replaying buffered events after `last_event_id`.
+
+        Returns the subscription and whether the client must resync because
+        the events it missed are no longer available.
+        """
+        subscription=Subscription(self, match, self.queue_size)
+        with self._lock:
+            resync=False
+            if last_event_id:
+                last_seq=self._parse_id(last_event_id)
+                oldest=self._buffer[0][0] if self._buffer else self._seq + 1
+                if last_seq is None or last_seq > self._seq or last_seq < oldest - 1:
+                    resync=True
+                else:
+                    subscription.pending.extend(
+                        (self._event_id(seq), event) for seq, event in self._buffer
+                        if seq > last_seq and match(event)
+                    )
+            self._subscriptions.add(subscription)
+            subscribers_gauge.set(len(self._subscriptions))
+        return subscription, resync
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            subscribers_gauge.set(len(self._subscriptions))
+
+
+class EventTransport:
+    """Delivers published events to the broker of every worker."""
+
+    def __init__(self, broker: EventBroker):
+        self.broker=broker
+
+    def publish(self, events: list[dict]) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class MemoryTransport(EventTransport):
+    """Single-process transport: events go straight to the local broker."""
+
+    def publish(self, events: list[dict]) -> None:
+        if events:
+            self.broker.dispatch(events)
+
+
+class PostgresTransport(EventTransport):
+    """Fans events out across workers with Postgres NOTIFY/LISTEN.
+
+    Publishing sends NOTIFY on a pooled connection; every worker, including
+    the publisher, runs a listener thread on a dedicated connection and
+    dispatches what it receives to its local broker, so all workers see
+    events in the same order.
+    """
+
+    def __init__(self, broker: EventBroker, engine: Engine, channel: str):
+        super().__init__(broker)
+        self.engine=engine
+        self.channel=channel
+        self._stop=threading.Event()
+        self._thread: Optional[threading.Thread]=None
+
+    def _payloads(self, events: list[dict]) -> Iterable[str]:
+        chunk: list[str]=[]
+        size=2
+        for event in events:
+            encoded=json.dumps(event, separators=(",", ":"))
+            if chunk and size + len(encoded) + 1 > NOTIFY_PAYLOAD_LIMIT:
+                yield "[" + ",".join(chunk) + "]"
+                chunk, size=[], 2
+            chunk.append(encoded)
+            size+=len(encoded) + 1
+        if chunk:
+            yield "[" + ",".join(chunk) + "]"
+
+    def publish(self, events: list[dict]) -> None:
+        if not events:
+            return
+        # Called after the write has committed, so a failed NOTIFY must not
+        # fail the request; the events are lost, but not the change itself,
+        # which clients still pick up on their next conditional GET.
+        try:
+            with self.engine.begin() as connection:
+                for payload in self._payloads(events):
+                    connection.execute(sql_select(func.pg_notify(self.channel, payload)))
+        except Exception:
+            logger.exception("NOTIFY %s failed; %d events dropped", self.channel, len(events))
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread=threading.Thread(target=self._listen_forever, name=f"listen-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread=None
+
+    def _listen_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("LISTEN %s failed; reconnecting", self.channel)
+                self._stop.wait(1)
+
+    def _listen(self) -> None:
+        # A dedicated connection, detached from the pool for the listener's lifetime.
+        raw=self.engine.raw_connection()
+        raw.detach()
+        connection=raw.driver_connection
+        try:
+            connection.autocommit=True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            while not self._stop.is_set():
+                if select.select([connection], [], [], 1.0)==([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify=connection.notifies.pop(0)
+                    self.broker.dispatch(json.loads(notify.payload))
+        finally:
+            connection.close()
@@ -0,0 +1,128 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from app.core import metrics
+from app.core.config import settings
+
+logger=logging.getLogger("app.sql")
+
+request_latency=metrics.Histogram("http_request_duration_seconds", "HTTP request latency by route.")
+request_queries=metrics.Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.",
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+request_db_time=metrics.Histogram("http_request_db_seconds", "Time spent executing SQL per HTTP request.")
+query_latency=metrics.Histogram("db_query_duration_seconds", "SQL statement execution time.")
+slow_queries=metrics.Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+pool_wait=metrics.Histogram("db_pool_checkout_seconds", "Time spent waiting to check a connection out of the pool.")
+pool_checked_out=metrics.Gauge("db_pool_checked_out", "Connections currently checked out of the pool.")
+
+
+class RequestStats:
+    __slots__=("queries", "db_time")
+
+    def __init__(self):
+        self.queries=0
+        self.db_time=0.0
+
+
+# Set per request by the middleware. Sync routes run in the thread pool with a
+# copy of the context, so they update the same RequestStats object.
+_request_stats: ContextVar[Optional[RequestStats]]=ContextVar("request_stats", default=None)
+
+
+class InstrumentedQueuePool(QueuePool):
+    _instrumented_name="primary"
+
+    def recreate(self):
+        # Engine.dispose() swaps in a recreated pool; keep its metrics label.
+        pool=super().recreate()
+        pool._instrumented_name=self._instrumented_name
+        return pool
+
+    def _do_get(self):
+        start=time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.observe(time.perf_counter() - start, engine=self._instrumented_name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed=time.perf_counter() - conn.info["query_start"].pop()
+    query_latency.observe(elapsed)
+
+    stats=_request_stats.get()
+    if stats is not None:
+        stats.queries+=1
+        stats.db_time+=elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_queries.inc()
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+
+def _handle_error(exception_context):
+    starts=exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine, name: str="primary") -> None:
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool._instrumented_name=name
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def update_pool_gauges(engines: dict[str, Engine]) -> None:
+    for name, engine in engines.items():
+        checkedout=getattr(engine.pool, "checkedout", None)
+        if checkedout is not None:
+            pool_checked_out.set(checkedout(), engine=name)
+
+
+class InstrumentationMiddleware:
+    """Records latency and SQL usage per route; optionally adds Server-Timing."""
+
+    def __init__(self, app):
+        self.app=app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"]!="http":
+            await self.app(scope, receive, send)
+            return
+
+        stats=RequestStats()
+        token=_request_stats.set(stats)
+        start=time.perf_counter()
+        status_code=500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"]=="http.response.start":
+                status_code=message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    total_ms=(time.perf_counter() - start) * 1000
+                    value=f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", app;dur={total_ms:.1f}'
+                    message["headers"]=list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route=scope.get("route")
+            path=getattr(route, "path", "unmatched")
+            request_latency.observe(time.perf_counter() - start, method=scope["method"], route=path, status=status_code)
+            request_queries.observe(stats.queries, route=path)
+            request_db_time.observe(stats.db_time, route=path)
+            _request_stats.reset(token)
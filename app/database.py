@@ -1,17 +1,87 @@
+import logging
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedQueuePool, instrument_engine
 
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+def _engine_options(database_url: str) -> dict:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # in-memory SQLite needs its own single-connection pool
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def _create_engine(database_url: str, name: str) -> Engine:
+    new_engine = create_engine(database_url, **_engine_options(database_url))
+    instrument_engine(new_engine, name)
+    return new_engine
+
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# Read-only queries go to the replica when one is configured; without one the
+# read engine is simply the primary.
+read_engine = _create_engine(settings.READ_REPLICA_URL, "replica") if settings.READ_REPLICA_URL else engine
 
 SessionLocal=sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal=sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base=declarative_base()
 
+def engines() -> dict[str, Engine]:
+    if read_engine is engine:
+        return {"primary": engine}
+    return {"primary": engine, "replica": read_engine}
+
+def warm_pool(target: Engine, size: Optional[int] = None) -> int:
+    """Open `size` connections up front so the first requests don't pay for connection setup."""
+    if not isinstance(target.pool, QueuePool):
+        # e.g. the single-connection pool of in-memory SQLite: nothing to warm
+        return 0
+    size = settings.DB_POOL_WARM if size is None else size
+    pool_size = target.pool.size()
+    connections = []
+    try:
+        for _ in range(min(size, pool_size)):
+            connections.append(target.connect())
+    except Exception:
+        logger.warning("Could not pre-open database connections", exc_info=True)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+def warm_pools() -> None:
+    for name, target in engines().items():
+        opened = warm_pool(target)
+        logger.info("Pre-opened %d %s database connections", opened, name)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
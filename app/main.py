@@ -1,19 +1,58 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from anyio import to_thread
+from starlette.concurrency import run_in_threadpool
 from app.routers import tasks, users
+from app.core.config import settings
+from app.core import metrics
+from app.core.instrumentation import InstrumentationMiddleware, update_pool_gauges
+from app.database import engines, warm_pools
+from app.utils import hashing
+from app.utils.jobs import BackgroundJobs
+from app.utils.roles import RoleRegistry
+from app.services.stats_service import StatsService
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.task_archive_service import TaskArchiveService
+from app.services.task_import_service import TaskImportService
+from app.services.task_deadlines import TaskDeadlines
+from app.services.task_events import TaskEvents
 from contextlib import asynccontextmanager
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Application starting...")
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    await run_in_threadpool(warm_pools)
+    await run_in_threadpool(RoleRegistry.reload)
+    await run_in_threadpool(TaskImportService.startup)
+    TaskEvents.transport.start()
+    jobs = BackgroundJobs()
+    jobs.every("stats-reconcile", settings.STATS_RECONCILE_INTERVAL_SECONDS, StatsService.run_reconciliation)
+    jobs.every("task-archive", settings.TASK_ARCHIVE_INTERVAL_SECONDS, TaskArchiveService.run_archival)
+    jobs.every("refresh-token-purge", settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS, RefreshTokenService.purge_expired)
+    if settings.TASK_DUE_POLL_SECONDS > 0:
+        TaskDeadlines.start()
     yield 
+    await jobs.stop()
+    await TaskDeadlines.stop()
+    await run_in_threadpool(TaskImportService.shutdown)
+    await run_in_threadpool(TaskEvents.transport.stop)
+    hashing.executor.shutdown()
     print("Shut down...")
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(InstrumentationMiddleware)
 
 app.include_router(tasks.router, tags=["Tasks"])
 app.include_router(users.router, tags=["Users"])
 
 @app.get("/")
 def root():
-    return {"message": "Welcome to Task Master API"}
\ No newline at end of file
+    return {"message": "Welcome to Task Master API"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        update_pool_gauges(engines())
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
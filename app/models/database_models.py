@@ -1,8 +1,8 @@
 import enum
-from sqlalchemy import Integer, Column, String, Enum, DateTime, ForeignKey
+from sqlalchemy import Integer, Column, String, Enum, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship 
 from app.database import Base
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column, text
 
 class TaskStatus(str, enum.Enum):
     TODO = "TODO"
@@ -20,6 +20,12 @@ class UserStatus(str, enum.Enum):
     ACTIVE = "ACTIVE"
     ARCHIVED = "ARCHIVED"
 
+class TaskImportStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
 class User(Base):
     __tablename__="users"
 
@@ -27,14 +33,28 @@ class User(Base):
     email=Column(String, unique=True, index=True)
     hashed_password=Column(String)
     full_name=Column(String, nullable=True)
-    role_id=Column(Integer, ForeignKey("roles.id"))
-    status=Column(Enum(UserStatus), default=UserStatus.PENDING, nullable=False)
+    role_id=Column(Integer, ForeignKey("roles.id"), index=True)
+    status=Column(Enum(UserStatus), default=UserStatus.PENDING, nullable=False, index=True)
+    # Bumped whenever any of the user's tasks change; the /my-tasks ETag.
+    tasks_version=Column(Integer, nullable=False, default=0, server_default="0")
 
     role=relationship("Role", back_populates="users")
     tasks = relationship("Task", back_populates="owner")
 
 class Task(Base):
     __tablename__="tasks"
+    __table_args__=(
+        Index("ix_tasks_owner_id_id", "owner_id", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        # Open deadlines only, in the order the due-date scheduler reads them.
+        Index(
+            "ix_tasks_open_due_date_id", "due_date", "id",
+            postgresql_where=text("status <> 'DONE' AND due_date IS NOT NULL"),
+            sqlite_where=text("status <> 'DONE' AND due_date IS NOT NULL"),
+        ),
+        # Ids must never be reused: archived tasks keep theirs (see ArchivedTask).
+        {"sqlite_autoincrement": True},
+    )
 
     id=Column(Integer, primary_key=True, index=True)
     title=Column(String, nullable=False)
@@ -43,12 +63,105 @@ class Task(Base):
     due_date=Column(DateTime, nullable=True)
 
     created_at=Column(DateTime(timezone=True), server_default=func.now())
+    updated_at=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Incremented by every UPDATE, ORM or bulk; the task's ETag and If-Match token.
+    version=Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
     category = Column(Enum(TaskCategory), default=TaskCategory.OTHER, nullable=False)
 
     owner_id=Column(Integer, ForeignKey("users.id"))
     owner = relationship("User", back_populates="tasks")
 
+    # Not a column: tells live tasks from ArchivedTask rows in merged listings.
+    archived=False
+
+class ArchivedTask(Base):
+    """DONE tasks past TASK_ARCHIVE_AFTER_DAYS and tasks of archived users, moved out of `tasks`.
+
+    Rows keep their task id, so ids stay unique across both tables.
+    """
+    __tablename__="archived_tasks"
+    __table_args__=(
+        Index("ix_archived_tasks_owner_id_id", "owner_id", "id"),
+    )
+
+    id=Column(Integer, primary_key=True, autoincrement=False)
+    title=Column(String, nullable=False)
+    description=Column(String, nullable=True)
+    status=Column(Enum(TaskStatus), nullable=False)
+    due_date=Column(DateTime, nullable=True)
+    created_at=Column(DateTime(timezone=True))
+    updated_at=Column(DateTime(timezone=True))
+    version=Column(Integer, nullable=False)
+    category=Column(Enum(TaskCategory), nullable=False)
+    owner_id=Column(Integer, ForeignKey("users.id"))
+    archived_at=Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    owner=relationship("User")
+
+    archived=True
+
+class TaskImport(Base):
+    """A bulk task upload and its progress; see TaskImportService."""
+    __tablename__="task_imports"
+
+    id=Column(Integer, primary_key=True, index=True)
+    owner_id=Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    format=Column(String, nullable=False)
+    status=Column(Enum(TaskImportStatus), nullable=False, default=TaskImportStatus.PENDING)
+    rows_processed=Column(Integer, nullable=False, default=0)
+    rows_imported=Column(Integer, nullable=False, default=0)
+    rows_failed=Column(Integer, nullable=False, default=0)
+    error=Column(String, nullable=True)
+    created_at=Column(DateTime(timezone=True), server_default=func.now())
+    updated_at=Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at=Column(DateTime(timezone=True), nullable=True)
+
+class TaskImportError(Base):
+    """A rejected row of an import; only the first TASK_IMPORT_MAX_ERRORS are kept."""
+    __tablename__="task_import_errors"
+    __table_args__=(
+        Index("ix_task_import_errors_import_id_id", "import_id", "id"),
+    )
+
+    id=Column(Integer, primary_key=True)
+    import_id=Column(Integer, ForeignKey("task_imports.id", ondelete="CASCADE"), nullable=False)
+    line=Column(Integer, nullable=False)
+    detail=Column(String, nullable=False)
+
+class RefreshToken(Base):
+    """An issued refresh token, stored as its SHA-256 digest; see RefreshTokenService.
+
+    Every rotation revokes the presented token and issues a successor in the
+    same family, so reuse of a revoked token can revoke the whole family.
+    """
+    __tablename__="refresh_tokens"
+
+    id=Column(Integer, primary_key=True)
+    user_id=Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash=Column(String(64), nullable=False, unique=True)
+    family=Column(String(32), nullable=False, index=True)
+    created_at=Column(DateTime(timezone=True), server_default=func.now())
+    expires_at=Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at=Column(DateTime(timezone=True), nullable=True)
+
+class TaskDeadlineWatermark(Base):
+    """How far the due-date scheduler has fired each kind of deadline."""
+    __tablename__="task_deadline_watermarks"
+
+    kind=Column(String, primary_key=True)
+    fire_at=Column(DateTime, nullable=False)
+    task_id=Column(Integer, nullable=False, default=0)
+
+class StatCounter(Base):
+    """One of STATS_COUNTER_SLOTS partial sums of a counter; see StatsService."""
+    __tablename__="stat_counters"
+
+    scope=Column(String, primary_key=True)
+    bucket=Column(String, primary_key=True)
+    slot=Column(Integer, primary_key=True, default=0, server_default="0")
+    value=Column(Integer, nullable=False, default=0)
+
 class Role(Base):
     __tablename__="roles"
 
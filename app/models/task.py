@@ -2,9 +2,16 @@
 from pydantic import BaseModel, computed_field, field_validator, EmailStr
 from datetime import datetime, timezone
 from typing import Optional
-from .database_models import TaskStatus, TaskCategory
+from .database_models import TaskStatus, TaskCategory, TaskImportStatus
 from .user import UserOut
 
+STATUS_DISPLAY = {
+    TaskStatus.TODO: "To Do",
+    TaskStatus.IN_PROGRESS: "In Progress",
+    TaskStatus.DONE: "Done"
+}
+UNKNOWN_STATUS_DISPLAY = "Unknown"
+
 class TaskBase(BaseModel): 
     title: str
     description: Optional[str] = None
@@ -14,9 +21,11 @@ class DateValidationMixIn:
     @field_validator('due_date')
     @classmethod
     def date_must_be_in_future(cls, input_date:datetime):
+        if input_date is None:
+            return None
         if input_date.tzinfo is None:
             input_date = input_date.replace(tzinfo=timezone.utc)
-        if input_date and input_date<datetime.now(timezone.utc):
+        if input_date<datetime.now(timezone.utc):
             raise ValueError("Due date cannot be a past time.")
         return input_date
 
@@ -43,16 +52,12 @@ class TaskOut(TaskBase):
     owner: UserSummary
     status: TaskStatus
     category: TaskCategory
+    archived: bool = False
 
     @computed_field
     @property
     def status_display(self) -> str:
-        mapping = {
-            TaskStatus.TODO: "To Do",
-            TaskStatus.IN_PROGRESS: "In Progress",
-            TaskStatus.DONE: "Done"
-        }
-        return mapping.get(self.status, "Unknown")
+        return STATUS_DISPLAY.get(self.status, UNKNOWN_STATUS_DISPLAY)
 
     class Config:
         from_attributes = True
@@ -62,4 +67,58 @@ class TaskUpdate(BaseModel, DateValidationMixIn):
     description: Optional[str]=None
     status: Optional[TaskStatus]=None
     due_date: Optional[datetime]=None
-    category: Optional[TaskCategory]=None
\ No newline at end of file
+    category: Optional[TaskCategory]=None
+
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+class TaskBatchDelete(BaseModel):
+    ids: list[int]
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BatchItemResult]
+
+class TaskImportOut(BaseModel):
+    id: int
+    format: str
+    status: TaskImportStatus
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class TaskImportErrorOut(BaseModel):
+    id: int
+    line: int
+    detail: str
+
+    class Config:
+        from_attributes = True
+
+class TaskDue(BaseModel):
+    id: int
+    title: str
+    status: TaskStatus
+    category: TaskCategory
+    due_date: datetime
+
+class TaskSummary(BaseModel):
+    total: int
+    overdue: int
+    by_status: dict[TaskStatus, int]
+    by_category: dict[TaskCategory, int]
+    counts: dict[TaskStatus, dict[TaskCategory, int]]
+    next_due: list[TaskDue]
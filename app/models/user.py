@@ -25,8 +25,16 @@ class UserOut(UserBase):
 class UserLogin(UserBase):
     password: str
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class AdminStats(BaseModel):
     total_users:int
     users_by_status: dict[str, int]
     total_tasks: int
-    tasks_by_status: dict[str, int]
\ No newline at end of file
+    tasks_by_status: dict[str, int]
+    tasks_by_category: dict[str, int]
+
+class UserTaskStats(BaseModel):
+    user_id: int
+    total_tasks: int
\ No newline at end of file
@@ -1,43 +1,161 @@
-from fastapi import APIRouter, Depends, Query
+from functools import partial
+from typing import Any, Literal
+from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from app.models.task import TaskCreate
-from app.database import get_db
-from app.utils.security import get_current_user, admin_required
+from app.database import get_db, get_read_db
+from app.utils.security import get_current_user, admin_required, may_follow_changes, recheck_follower, Principal
 from sqlalchemy.orm import Session, joinedload
-from app.models.database_models import User, TaskStatus
-from app.models.task import TaskOut, TaskUpdate
+from app.models.database_models import TaskStatus
+from app.models.task import TaskOut, TaskUpdate, TaskBatchDelete, BatchResult, TaskImportOut, TaskImportErrorOut, TaskSummary
 from app.services.task_service import TaskService
+from app.services.task_batch_service import TaskBatchService
+from app.services.export_service import ExportService, MEDIA_TYPES
+from app.services.task_events import TaskEvents
+from app.services.task_import_service import TaskImportService
+from app.utils.etag import task_etag
+from app.utils.fieldsets import parse_task_fieldset
+from app.utils.serialization import task_json, task_list_json
+from app.utils.pagination import NEXT_CURSOR_HEADER, check_pagination, next_cursor
 
 router=APIRouter()
 
+FIELDS_DESCRIPTION="Comma-separated TaskOut fields to return, e.g. `id,title,status`; `id` is always included."
+EMBED_DESCRIPTION="`owner` to embed the owner summary. Defaults to `owner` unless `fields` is given."
+ARCHIVED_DESCRIPTION="Also list archived tasks (old DONE tasks and tasks of archived users), marked `archived: true`."
+
+# Clients may keep the body but must revalidate it with If-None-Match.
+CACHE_CONTROL="private, no-cache"
+
+def _conditional_response(etag: str, body: bytes, headers: dict=None) -> Response:
+    headers={**(headers or {}), "ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _event_stream(owner_id: int, last_event_id: str, principal: Principal, admin: bool=False) -> StreamingResponse:
+    if not may_follow_changes(principal, admin):
+        raise HTTPException(status_code=403, detail="This account can no longer follow task changes.")
+    return StreamingResponse(
+        TaskEvents.stream(owner_id, last_event_id, partial(recheck_follower, principal.email, admin)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/tasks", response_model=list[TaskOut])
-async def get_all_tasks(
+def get_all_tasks(
     search: str = Query(None, min_length=3),
     status: TaskStatus = Query(None),       
     user_id: int = Query(None), 
     limit: int = Query(default=10, ge=1, le=100),
     skip: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db), 
-    admin:User=Depends(admin_required)
+    cursor: str = Query(None),
+    fields: str = Query(None, description=FIELDS_DESCRIPTION),
+    embed: str = Query(None, description=EMBED_DESCRIPTION),
+    include_archived: bool = Query(False, description=ARCHIVED_DESCRIPTION),
+    db: Session = Depends(get_read_db), 
+    admin: Principal=Depends(admin_required)
 ):
-    return TaskService.get_all_tasks(db, search, status, user_id, limit, skip)
+    check_pagination(skip, cursor)
+    fieldset=parse_task_fieldset(fields, embed)
+    tasks=TaskService.get_all_tasks(db, search, status, user_id, limit, skip, cursor, fieldset, include_archived)
+    page_cursor=None if search else next_cursor(tasks, limit)
+    return Response(
+        content=task_list_json(tasks, fieldset), media_type="application/json",
+        headers={NEXT_CURSOR_HEADER: page_cursor} if page_cursor else None,
+    )
     
+@router.get("/admin/tasks/export")
+def export_tasks(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    search: str = Query(None, min_length=3),
+    status: TaskStatus = Query(None),
+    user_id: int = Query(None),
+    admin: Principal=Depends(admin_required)
+):
+    return StreamingResponse(
+        ExportService.stream_tasks(format, search, status, user_id),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
 @router.get("/my-tasks", response_model=list[TaskOut])
-async def get_my_tasks(limit:int=Query(default=10, ge=1, le=100), skip:int=Query(default=0, ge=0), db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return TaskService.get_user_tasks(db, current_user, limit, skip)
+def get_my_tasks(limit:int=Query(default=10, ge=1, le=100), skip:int=Query(default=0, ge=0), cursor: str=Query(None), fields: str=Query(None, description=FIELDS_DESCRIPTION), embed: str=Query(None, description=EMBED_DESCRIPTION), include_archived: bool=Query(False, description=ARCHIVED_DESCRIPTION), if_none_match: str=Header(None), db: Session = Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    # Reads from the primary: the page is cached, and a lagging replica would
+    # store a stale page under the owner's current generation.
+    check_pagination(skip, cursor)
+    fieldset=parse_task_fieldset(fields, embed)
+    etag, body, page_cursor=TaskService.get_user_tasks_page(db, current_user, limit, skip, cursor, if_none_match, fieldset, include_archived)
+    return _conditional_response(etag, body, {NEXT_CURSOR_HEADER: page_cursor} if page_cursor else None)
+
+@router.get("/my-tasks/summary", response_model=TaskSummary)
+def get_my_tasks_summary(next_due: int=Query(default=5, ge=0, le=50, description="How many upcoming due tasks to include."), if_none_match: str=Header(None), db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    """Counts by status and category, the overdue count and the next due tasks, for the caller's live (not archived) tasks."""
+    etag, body=TaskService.get_user_summary_json(db, current_user, next_due, if_none_match)
+    return _conditional_response(etag, body)
+
+@router.get("/tasks/stream")
+def stream_my_tasks(last_event_id: str=Header(None), current_user: Principal=Depends(get_current_user)):
+    """Server-sent events for changes to the caller's tasks; resumes from `Last-Event-ID`."""
+    return _event_stream(current_user.id, last_event_id, current_user)
+
+@router.get("/admin/tasks/stream")
+def stream_all_tasks(last_event_id: str=Header(None), admin: Principal=Depends(admin_required)):
+    """Server-sent events for changes to any task."""
+    return _event_stream(None, last_event_id, admin, admin=True)
+
+@router.post("/tasks/batch", response_model=BatchResult)
+def create_tasks_batch(items: list[dict[str, Any]]=Body(...), db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    return TaskBatchService.create_tasks(db, items, current_user)
+
+@router.patch("/tasks/batch", response_model=BatchResult)
+def update_tasks_batch(items: list[dict[str, Any]]=Body(...), db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    return TaskBatchService.update_tasks(db, items, current_user)
+
+@router.delete("/tasks/batch", response_model=BatchResult)
+def delete_tasks_batch(batch: TaskBatchDelete, db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    return TaskBatchService.delete_tasks(db, batch.ids, current_user)
+
+@router.post("/tasks/import", response_model=TaskImportOut, status_code=202)
+def import_tasks(
+    file: UploadFile = File(...),
+    format: Literal["ndjson", "csv"] = Query(None, description="Defaults to the upload's file extension."),
+    db: Session=Depends(get_db),
+    current_user: Principal=Depends(get_current_user),
+):
+    """Queue a bulk import of the caller's tasks; poll the returned import for progress."""
+    fmt=format or (file.filename or "").rsplit(".", 1)[-1].lower()
+    return TaskImportService.start(db, current_user, file.file, fmt)
+
+@router.get("/tasks/import/{id}", response_model=TaskImportOut)
+def get_task_import(id: int, db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    return TaskImportService.get(db, id, current_user)
+
+@router.get("/tasks/import/{id}/errors", response_model=list[TaskImportErrorOut])
+def get_task_import_errors(id: int, response: Response, limit: int=Query(default=100, ge=1, le=1000), cursor: str=Query(None), db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    """Rejected rows with their line number, oldest first."""
+    errors=TaskImportService.get_errors(db, id, current_user, limit, cursor)
+    page_cursor=next_cursor(errors, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER]=page_cursor
+    return errors
 
 @router.get("/tasks/{id}", response_model=TaskOut)
-async def get_task(id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return TaskService.get_task(id, db, current_user)
+def get_task(id: int, if_none_match: str=Header(None), db: Session = Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    etag, body=TaskService.get_task_json(id, db, current_user, if_none_match)
+    return _conditional_response(etag, body)
 
-@router.post("/tasks")
-async def create_task(task_data: TaskCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return TaskService.create_task(task_data, db, current_user)
+@router.post("/tasks", response_model=TaskOut)
+def create_task(task_data: TaskCreate, db: Session = Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    task=TaskService.create_task(task_data, db, current_user)
+    return Response(content=task_json(task), media_type="application/json", headers={"ETag": task_etag(task.id, task.version)})
 
 @router.delete("/tasks/{id}", status_code=204)
-async def delete_task(id: int, db:Session=Depends(get_db), user:User=Depends(get_current_user)):  
+def delete_task(id: int, db:Session=Depends(get_db), user: Principal=Depends(get_current_user)):  
     TaskService.delete_task(db, id, user)
     return
 
 @router.patch("/tasks/{id}", response_model=TaskOut)
-async def update_task(id: int, task_update: TaskUpdate, db: Session=Depends(get_db), current_user:User=Depends(get_current_user)):
-    return TaskService.update_task(db, current_user, id, task_update)
+def update_task(id: int, task_update: TaskUpdate, if_match: str=Header(None), db: Session=Depends(get_db), current_user: Principal=Depends(get_current_user)):
+    task=TaskService.update_task(db, current_user, id, task_update, if_match)
+    return Response(content=task_json(task), media_type="application/json", headers={"ETag": task_etag(task.id, task.version)})
@@ -1,41 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.models.user import UserCreate, UserOut, AdminStats
-from app.database import get_db
-from app.utils.security import hash_password, verify_password, create_access_token, admin_required, check_if_admin_exists
+from typing import Literal
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from app.models.user import UserCreate, UserOut, AdminStats, UserTaskStats, TokenRefresh
+from app.database import get_db, get_read_db
+from app.utils.security import verify_password, create_access_token, admin_required, Principal
 from fastapi.security import OAuth2PasswordRequestForm
 from app.models.database_models import User, Role, UserStatus, Task
 from sqlalchemy.orm import Session
 from app.database import get_db
 from sqlalchemy import func
 from app.services.user_service import UserService
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.export_service import ExportService, MEDIA_TYPES
+from app.services.task_archive_service import TaskArchiveService
+from app.utils.pagination import NEXT_CURSOR_HEADER, check_pagination, next_cursor
+from app.utils.serialization import user_list_json
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserOut)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+def register(user: UserCreate, db: Session = Depends(get_db)):
     return UserService.register(db, user)
 
 @router.post("/login")
-async def login(login_data: OAuth2PasswordRequestForm=Depends(), db: Session = Depends(get_db)):
+def login(login_data: OAuth2PasswordRequestForm=Depends(), db: Session = Depends(get_db)):
     return UserService.login(db, login_data.username, login_data.password)
 
-@router.get("/admin/users")
-async def get_all_users(db: Session=Depends(get_db), admin: User=Depends(admin_required)):
-    return UserService.get_all_users(db)
+@router.post("/token/refresh")
+def refresh_token(body: TokenRefresh, db: Session=Depends(get_db)):
+    """Trade a refresh token for a new access token and a new refresh token; the old one stops working."""
+    return RefreshTokenService.rotate(db, body.refresh_token)
+
+@router.get("/admin/users", response_model=list[UserOut])
+def get_all_users(limit: int=Query(default=100, ge=1, le=1000), skip: int=Query(default=0, ge=0), cursor: str=Query(None), db: Session=Depends(get_read_db), admin: Principal=Depends(admin_required)):
+    check_pagination(skip, cursor)
+    users=UserService.get_all_users(db, limit, skip, cursor)
+    page_cursor=next_cursor(users, limit)
+    return Response(
+        content=user_list_json(users), media_type="application/json",
+        headers={NEXT_CURSOR_HEADER: page_cursor} if page_cursor else None,
+    )
+
+@router.get("/admin/users/export")
+def export_users(format: Literal["ndjson", "csv"]=Query("ndjson"), admin: Principal=Depends(admin_required)):
+    return StreamingResponse(
+        ExportService.stream_users(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
 
 @router.get("/pending-users", response_model=list[UserOut])
-async def get_pending_users(db: Session=Depends(get_db), admin: User=Depends(admin_required)):
-    return UserService.get_pending_users(db)
+def get_pending_users(db: Session=Depends(get_read_db), admin: Principal=Depends(admin_required)):
+    return Response(content=user_list_json(UserService.get_pending_users(db)), media_type="application/json")
 
-@router.patch("/users/{user_id}/process-approval")
-async def process_user_approval(user_id:int, approve: bool,db: Session=Depends(get_db), admin: User=Depends(admin_required)):
+@router.patch("/users/{user_id}/process-approval", response_model=UserOut)
+def process_user_approval(user_id:int, approve: bool,db: Session=Depends(get_db), admin: Principal=Depends(admin_required)):
     return UserService.process_user(db, user_id, approve)
 
 @router.get("/admin/stats", response_model=AdminStats)
-async def get_admin_stats(db: Session=Depends(get_db), admin: User=Depends(admin_required)):
+def get_admin_stats(db: Session=Depends(get_read_db), admin: Principal=Depends(admin_required)):
     return UserService.get_admin_data(db)
 
+@router.get("/admin/users/{user_id}/stats", response_model=UserTaskStats)
+def get_user_stats(user_id: int, db: Session=Depends(get_read_db), admin: Principal=Depends(admin_required)):
+    return UserService.get_user_stats(db, user_id)
+
 @router.delete("/admin/users/{user_id}", status_code=status.HTTP_200_OK)
-async def arhive_user(user_id:int, db:Session=Depends(get_db), admin:User=Depends(admin_required)):
+def arhive_user(user_id:int, background_tasks: BackgroundTasks, db:Session=Depends(get_db), admin: Principal=Depends(admin_required)):
     user= UserService.archive_user(db, user_id, admin)
-    return {"message": f"User {user.email} archived."}
+    # The user's tasks move to the archive in batches once the response is sent.
+    background_tasks.add_task(TaskArchiveService.archive_owner_tasks, user_id)
+    return {"message": f"User {user['email']} archived."}
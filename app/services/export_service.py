@@ -0,0 +1,97 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import ReadSessionLocal
+from app.models.database_models import Role, Task, TaskStatus, User
+from app.services.search_service import TaskSearch
+
+MEDIA_TYPES={
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+USER_COLUMNS=("id", "email", "full_name", "role", "status")
+TASK_COLUMNS=("id", "title", "description", "status", "category", "due_date", "created_at", "owner_id")
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_ndjson(columns: tuple, rows: list) -> bytes:
+    lines=(json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) for row in rows)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _encode_csv(columns: tuple, rows: list) -> bytes:
+    buffer=io.StringIO()
+    csv.writer(buffer).writerows([[_plain(value) for value in row] for row in rows])
+    return buffer.getvalue().encode()
+
+
+def _csv_header(columns: tuple) -> bytes:
+    buffer=io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue().encode()
+
+
+class ExportService:
+    """Chunked exports that keep memory flat regardless of table size.
+
+    Rows are read through a server-side cursor (yield_per) as plain tuples,
+    so neither the ORM identity map nor the response body ever holds more
+    than one chunk. The generators own their session because they keep
+    running after the endpoint has returned its StreamingResponse.
+    """
+
+    @staticmethod
+    def _stream(build_stmt, columns: tuple, fmt: str) -> Iterator[bytes]:
+        encode=_encode_csv if fmt=="csv" else _encode_ndjson
+        if fmt=="csv":
+            yield _csv_header(columns)
+
+        db=ReadSessionLocal()
+        try:
+            stmt=build_stmt(db).execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+            result=db.execute(stmt)
+            for rows in result.partitions():
+                yield encode(columns, rows)
+        finally:
+            db.close()
+
+    @staticmethod
+    def stream_users(fmt: str) -> Iterator[bytes]:
+        def build_stmt(db: Session):
+            return (
+                select(User.id, User.email, User.full_name, Role.name, User.status)
+                .outerjoin(Role, User.role_id==Role.id)
+                .order_by(User.id)
+            )
+        return ExportService._stream(build_stmt, USER_COLUMNS, fmt)
+
+    @staticmethod
+    def stream_tasks(fmt: str, search: str = None, status: TaskStatus = None, user_id: int = None) -> Iterator[bytes]:
+        def build_stmt(db: Session):
+            stmt=select(*(getattr(Task, column) for column in TASK_COLUMNS))
+
+            if status:
+                stmt=stmt.where(Task.status==status)
+
+            if user_id:
+                stmt=stmt.where(Task.owner_id==user_id)
+
+            if search:
+                return TaskSearch.apply(db, stmt, search)
+            return stmt.order_by(Task.id)
+
+        return ExportService._stream(build_stmt, TASK_COLUMNS, fmt)
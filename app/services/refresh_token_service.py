@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.database_models import RefreshToken, User, UserStatus
+from app.utils.roles import RoleRegistry
+from app.utils.security import create_access_token
+
+logger=logging.getLogger(__name__)
+
+refreshes=metrics.Counter("token_refreshes_total", "POST /token/refresh calls, by result.")
+
+
+def _digest(token: str) -> str:
+    # Refresh tokens are 256 random bits, so a fast hash is enough; bcrypt is what they avoid.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _invalid() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token", headers={"WWW-Authenticate": "Bearer"})
+
+
+class RefreshTokenService:
+    """Opaque, rotating refresh tokens.
+
+    A refresh token trades for a new access token without a password check.
+    Each use revokes it and issues a successor in the same family; presenting
+    an already revoked token means it leaked, so its whole family is revoked.
+    Only SHA-256 digests are stored.
+    """
+
+    @staticmethod
+    def issue(db: Session, user_id: int, family: str = None) -> str:
+        """Add a refresh token for `user_id`; the caller commits."""
+        token=secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=_digest(token),
+            family=family or uuid.uuid4().hex,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        return token
+
+    @staticmethod
+    def token_response(email: str, role_name: str, refresh_token: str) -> dict:
+        return {
+            "access_token": create_access_token(data={"sub": email, "role": role_name}),
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+        }
+
+    @staticmethod
+    def _revoke(db: Session, *criteria) -> None:
+        db.execute(
+            update(RefreshToken).where(*criteria, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc)),
+            execution_options={"synchronize_session": False},
+        )
+
+    @staticmethod
+    def revoke_user(db: Session, user_id: int) -> None:
+        """Revoke every live refresh token of `user_id`; the caller commits."""
+        RefreshTokenService._revoke(db, RefreshToken.user_id==user_id)
+
+    @staticmethod
+    def rotate(db: Session, token: str) -> dict:
+        now=datetime.now(timezone.utc)
+        token_hash=_digest(token)
+        # Revoking first means two requests racing with one token cannot both succeed.
+        row=db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash==token_hash, RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now)
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family),
+            execution_options={"synchronize_session": False},
+        ).first()
+        if row is None:
+            family=db.scalar(select(RefreshToken.family).where(RefreshToken.token_hash==token_hash, RefreshToken.revoked_at.is_not(None)))
+            if family is not None:
+                logger.warning("Revoked refresh token presented; revoking token family %s", family)
+                RefreshTokenService._revoke(db, RefreshToken.family==family)
+                db.commit()
+            refreshes.inc(result="revoked" if family is not None else "invalid")
+            raise _invalid()
+
+        user=db.execute(select(User.email, User.status, User.role_id).where(User.id==row.user_id)).first()
+        if user is None or user.status!=UserStatus.ACTIVE:
+            RefreshTokenService._revoke(db, RefreshToken.family==row.family)
+            db.commit()
+            refreshes.inc(result="inactive")
+            raise _invalid()
+
+        refresh_token=RefreshTokenService.issue(db, row.user_id, row.family)
+        db.commit()
+        refreshes.inc(result="rotated")
+        return RefreshTokenService.token_response(user.email, RoleRegistry.get_name(db, user.role_id), refresh_token)
+
+    @staticmethod
+    def purge_expired() -> None:
+        """Periodic job: drop expired tokens, revoked or not."""
+        db=SessionLocal()
+        try:
+            purged=db.execute(
+                delete(RefreshToken).where(RefreshToken.expires_at < datetime.now(timezone.utc)),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            db.commit()
+            if purged:
+                logger.info("Purged %d expired refresh tokens", purged)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
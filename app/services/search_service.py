@@ -0,0 +1,57 @@
+import re
+from typing import Union
+from sqlalchemy import Select, case, func, literal_column, or_
+from sqlalchemy.orm import Query, Session
+from app.models.database_models import Task
+
+# The expression of the ix_tasks_search_vector GIN index, written out as SQL:
+# the planner only uses the index for an identical expression, which bound
+# parameters would break. See the "add task search indexes" migration.
+search_vector=literal_column("to_tsvector('simple', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, ''))")
+
+LIKE_ESCAPE="!"
+
+_WORD=re.compile(r"\w+", re.UNICODE)
+
+
+def _like_pattern(term: str) -> str:
+    escaped=term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+    return f"%{escaped}%"
+
+
+def _prefix_tsquery(term: str) -> str:
+    # "desig rev" -> "desig:* & rev:*", every word matched as a prefix
+    return " & ".join(f"{word}:*" for word in _WORD.findall(term.lower()))
+
+
+class TaskSearch:
+    @staticmethod
+    def apply(db: Session, query: Union[Query, Select], term: str) -> Union[Query, Select]:
+        """Filter `query` to tasks matching `term` and order them by relevance."""
+        pattern=_like_pattern(term)
+        substring_match=or_(
+            Task.title.ilike(pattern, escape=LIKE_ESCAPE),
+            Task.description.ilike(pattern, escape=LIKE_ESCAPE),
+        )
+
+        if db.get_bind().dialect.name=="postgresql":
+            return TaskSearch._apply_postgres(query, term, substring_match)
+
+        rank=case((Task.title.ilike(pattern, escape=LIKE_ESCAPE), 2), else_=1)
+        return query.filter(substring_match).order_by(rank.desc(), Task.id)
+
+    @staticmethod
+    def _apply_postgres(query: Union[Query, Select], term: str, substring_match) -> Union[Query, Select]:
+        # The tsvector GIN index serves word/prefix matches, the pg_trgm GIN
+        # indexes serve the ILIKE substring fallback; Postgres combines them
+        # with a BitmapOr instead of scanning the table.
+        tsquery_text=_prefix_tsquery(term)
+        if not tsquery_text:
+            return query.filter(substring_match).order_by(Task.id)
+
+        tsquery=func.to_tsquery("simple", tsquery_text)
+        rank=func.ts_rank(search_vector, tsquery) + func.similarity(Task.title, term)
+        return (
+            query.filter(or_(search_vector.op("@@")(tsquery), substring_match))
+            .order_by(rank.desc(), Task.id)
+        )
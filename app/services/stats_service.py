@@ -0,0 +1,148 @@
+import enum
+import logging
+import random
+from collections import Counter
+from typing import Optional
+from sqlalchemy import String, cast, func, literal, select, text, union_all
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.database_models import ArchivedTask, StatCounter, Task, User
+from app.utils.sql import dialect_name, upsert
+
+logger=logging.getLogger(__name__)
+
+USERS_BY_STATUS="users_by_status"
+TASKS_BY_STATUS="tasks_by_status"
+TASKS_BY_CATEGORY="tasks_by_category"
+TASKS_BY_OWNER="tasks_by_owner"
+
+
+def _bucket(value) -> str:
+    return value.value if isinstance(value, enum.Enum) else str(value)
+
+
+class StatsService:
+    """Incrementally maintained counters behind /admin/stats.
+
+    Mutating service methods record their deltas in the same transaction as the
+    change itself, so reading the stats is a lookup in the small stat_counters
+    table instead of COUNT/GROUP BY scans over users and tasks. Task counters
+    include archived tasks, so archival does not change them. reconcile()
+    rebuilds every counter from the source tables and is run periodically to
+    correct any drift.
+
+    A few counters (tasks by status and category) change with every task
+    write, and their row locks are held until the write commits. To keep
+    those writes from serializing on one row, each counter is spread over
+    STATS_COUNTER_SLOTS rows: a session adds to one randomly chosen slot, and
+    reads sum the slots. Writes only wait on each other when they pick the
+    same slot.
+    """
+
+    @staticmethod
+    def task_delta(status, category, owner_id: Optional[int], sign: int=1) -> Counter:
+        delta=Counter()
+        delta[(TASKS_BY_STATUS, _bucket(status))]+=sign
+        delta[(TASKS_BY_CATEGORY, _bucket(category))]+=sign
+        if owner_id is not None:
+            delta[(TASKS_BY_OWNER, str(owner_id))]+=sign
+        return delta
+
+    @staticmethod
+    def user_delta(old_status, new_status) -> Counter:
+        delta=Counter()
+        if old_status is not None:
+            delta[(USERS_BY_STATUS, _bucket(old_status))]-=1
+        if new_status is not None:
+            delta[(USERS_BY_STATUS, _bucket(new_status))]+=1
+        return delta
+
+    @staticmethod
+    def _slot(db: Session) -> int:
+        # One slot per session, so a transaction that applies several deltas
+        # still locks its rows in sorted order.
+        if "stat_slot" not in db.info:
+            db.info["stat_slot"]=random.randrange(max(settings.STATS_COUNTER_SLOTS, 1))
+        return db.info["stat_slot"]
+
+    @staticmethod
+    def apply(db: Session, delta: Counter) -> None:
+        """Add `delta` to the counters in one upsert; the caller commits."""
+        slot=StatsService._slot(db)
+        # Sorted so concurrent transactions lock counter rows in the same order.
+        rows=[
+            {"scope": scope, "bucket": bucket, "slot": slot, "value": value}
+            for (scope, bucket), value in sorted(delta.items())
+            if value
+        ]
+        if not rows:
+            return
+        stmt=upsert(db, StatCounter).values(rows)
+        stmt=stmt.on_conflict_do_update(
+            index_elements=[StatCounter.scope, StatCounter.bucket, StatCounter.slot],
+            set_={"value": StatCounter.value + stmt.excluded.value},
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def read(db: Session, *scopes: str) -> dict[str, dict[str, int]]:
+        total=func.sum(StatCounter.value)
+        rows=db.execute(
+            select(StatCounter.scope, StatCounter.bucket, total)
+            .where(StatCounter.scope.in_(scopes))
+            .group_by(StatCounter.scope, StatCounter.bucket)
+            .having(total!=0)
+        ).all()
+        result={scope: {} for scope in scopes}
+        for scope, bucket, value in rows:
+            result[scope][bucket]=value
+        return result
+
+    @staticmethod
+    def owner_task_count(db: Session, owner_id: int) -> int:
+        value=db.query(func.sum(StatCounter.value)).filter(
+            StatCounter.scope==TASKS_BY_OWNER,
+            StatCounter.bucket==str(owner_id),
+        ).scalar()
+        return value or 0
+
+    @staticmethod
+    def reconcile(db: Session) -> None:
+        """Recompute every counter from users, tasks and archived tasks."""
+        if dialect_name(db)=="postgresql":
+            # Blocks counter upserts until the rebuild commits, so writes that
+            # land mid-rebuild are neither lost nor counted twice.
+            db.execute(text("LOCK TABLE stat_counters IN EXCLUSIVE MODE"))
+        db.query(StatCounter).delete(synchronize_session=False)
+
+        all_tasks=union_all(
+            select(Task.status, Task.category, Task.owner_id),
+            select(ArchivedTask.status, ArchivedTask.category, ArchivedTask.owner_id),
+        ).subquery()
+        sources=[
+            (USERS_BY_STATUS, User.status),
+            (TASKS_BY_STATUS, all_tasks.c.status),
+            (TASKS_BY_CATEGORY, all_tasks.c.category),
+            (TASKS_BY_OWNER, all_tasks.c.owner_id),
+        ]
+        for scope, column in sources:
+            grouped=(
+                select(literal(scope), cast(column, String), func.count())
+                .where(column.is_not(None))
+                .group_by(column)
+            )
+            db.execute(StatCounter.__table__.insert().from_select(["scope", "bucket", "value"], grouped))
+        db.commit()
+        logger.info("Stat counters reconciled")
+
+    @staticmethod
+    def run_reconciliation() -> None:
+        db=SessionLocal()
+        try:
+            StatsService.reconcile(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
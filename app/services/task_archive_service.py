@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.database_models import ArchivedTask, Task, TaskStatus, User, UserStatus
+from app.services.task_cache import TaskCache
+from app.services.task_events import TaskEvents, ARCHIVED
+from app.services.task_versions import TaskVersions
+
+logger=logging.getLogger(__name__)
+
+archived_tasks=metrics.Counter("tasks_archived_total", "Tasks moved to archived_tasks, by reason.")
+
+DONE_EXPIRED="done_expired"
+OWNER_ARCHIVED="owner_archived"
+
+# Copied unchanged; archived_at is filled in by the database.
+ARCHIVED_COLUMNS=("id", "title", "description", "status", "due_date", "created_at", "updated_at", "version", "category", "owner_id")
+
+
+class TaskArchiveService:
+    """Moves tasks nobody works on any more out of the hot `tasks` table.
+
+    Candidates are DONE tasks untouched for TASK_ARCHIVE_AFTER_DAYS and all
+    tasks of archived users. They move in batches of TASK_ARCHIVE_BATCH_SIZE,
+    one transaction each, so a large backlog never turns into one long
+    transaction. Archived tasks are still counted by the stat counters, so
+    moving them leaves the counters alone.
+    """
+
+    @staticmethod
+    def move_batch(db: Session, criteria: list, limit: int) -> list[tuple[int, int]]:
+        """Move up to `limit` tasks matching `criteria`; returns their (id, owner_id)."""
+        # SKIP LOCKED leaves rows that a request is writing right now for a later batch.
+        ids=db.scalars(
+            select(Task.id).where(*criteria).order_by(Task.id).limit(limit).with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            return []
+
+        columns=[getattr(Task, name) for name in ARCHIVED_COLUMNS]
+        db.execute(insert(ArchivedTask).from_select(ARCHIVED_COLUMNS, select(*columns).where(Task.id.in_(ids))))
+        moved=db.execute(
+            delete(Task).where(Task.id.in_(ids)).returning(Task.id, Task.owner_id),
+            execution_options={"synchronize_session": False},
+        ).all()
+        owners={owner_id for _, owner_id in moved}
+        TaskVersions.bump_owners(db, owners)
+        db.commit()
+        TaskCache.invalidate_owners(owners)
+        TaskEvents.publish(ARCHIVED, moved)
+        return moved
+
+    @staticmethod
+    def _drain(db: Session, criteria: list, reason: str) -> int:
+        total=0
+        while True:
+            moved=len(TaskArchiveService.move_batch(db, criteria, settings.TASK_ARCHIVE_BATCH_SIZE))
+            archived_tasks.inc(moved, reason=reason)
+            total+=moved
+            if moved < settings.TASK_ARCHIVE_BATCH_SIZE:
+                return total
+
+    @staticmethod
+    def _run(work) -> None:
+        db=SessionLocal()
+        try:
+            work(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def archive_owner_tasks(owner_id: int) -> None:
+        """Move every task of `owner_id`; run after the user has been archived."""
+        def work(db: Session):
+            moved=TaskArchiveService._drain(db, [Task.owner_id==owner_id], OWNER_ARCHIVED)
+            logger.info("Archived %d tasks of user %d", moved, owner_id)
+        TaskArchiveService._run(work)
+
+    @staticmethod
+    def run_archival() -> None:
+        """Periodic job: expired DONE tasks, plus tasks of archived users still left in `tasks`."""
+        def work(db: Session):
+            done=0
+            if settings.TASK_ARCHIVE_AFTER_DAYS > 0:
+                cutoff=datetime.now(timezone.utc) - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+                last_touched=func.coalesce(Task.updated_at, Task.created_at)
+                done=TaskArchiveService._drain(db, [Task.status==TaskStatus.DONE, last_touched < cutoff], DONE_EXPIRED)
+            archived_owners=select(User.id).where(User.status==UserStatus.ARCHIVED)
+            orphaned=TaskArchiveService._drain(db, [Task.owner_id.in_(archived_owners)], OWNER_ARCHIVED)
+            if done or orphaned:
+                logger.info("Archived %d DONE tasks and %d tasks of archived users", done, orphaned)
+        TaskArchiveService._run(work)
@@ -0,0 +1,205 @@
+from collections import Counter
+from typing import Any
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.database_models import Task, TaskStatus
+from app.models.task import TaskCreate, TaskBatchUpdate, BatchItemResult
+from app.services.stats_service import StatsService
+from app.services.task_cache import TaskCache
+from app.services.task_events import TaskEvents, CREATED, UPDATED, DELETED
+from app.services.task_versions import TaskVersions
+from app.utils.security import Principal
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'body'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+# Task columns an update may not set to null; TaskUpdate allows None for all of them.
+NOT_NULL_FIELDS=frozenset(column.name for column in Task.__table__.columns if not column.nullable)
+
+
+def _null_fields_detail(item: TaskBatchUpdate) -> str:
+    return "; ".join(
+        f"{name}: may not be null"
+        for name, value in item.model_dump(exclude_unset=True).items()
+        if value is None and name in NOT_NULL_FIELDS
+    )
+
+
+def _error(index: int, detail: str, id: int = None) -> BatchItemResult:
+    return BatchItemResult(index=index, id=id, status="error", detail=detail)
+
+
+def _summary(results: list[BatchItemResult]) -> dict:
+    failed=sum(1 for result in results if result.status=="error")
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
+
+
+class TaskBatchService:
+    """Batch variants of the task mutations.
+
+    Each item is validated on its own so one bad item does not reject the
+    batch; valid items are written with a constant number of statements.
+    """
+
+    @staticmethod
+    def _check_size(items: list) -> None:
+        if len(items) > settings.TASK_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"A batch may contain at most {settings.TASK_BATCH_MAX_ITEMS} items.",
+            )
+
+    @staticmethod
+    def _load_for_write(db: Session, ids: list[int]) -> dict[int, Any]:
+        # One query checks existence and ownership for the whole batch; the
+        # rows stay locked until commit so the check cannot go stale.
+        rows=(
+            db.query(Task.id, Task.owner_id, Task.status, Task.category)
+            .filter(Task.id.in_(ids))
+            .with_for_update()
+            .all()
+        )
+        return {row.id: row for row in rows}
+
+    @staticmethod
+    def _check_access(index: int, id: int, row, user: Principal, seen: set, action: str):
+        if id in seen:
+            return _error(index, "Task appears more than once in this batch.", id)
+        if row is None:
+            return _error(index, "Task not found", id)
+        if row.owner_id!=user.id and not user.is_active_admin:
+            return _error(index, f"You are not allowed to {action} this task.", id)
+        return None
+
+    @staticmethod
+    def create_tasks(db: Session, items: list[dict], user: Principal) -> dict:
+        TaskBatchService._check_size(items)
+        results: list[BatchItemResult]=[None] * len(items)
+        valid: list[tuple[int, dict]]=[]
+
+        for index, raw in enumerate(items):
+            try:
+                task=TaskCreate.model_validate(raw)
+                TaskStatus(task.status)
+            except ValidationError as exc:
+                results[index]=_error(index, _validation_detail(exc))
+                continue
+            except ValueError:
+                results[index]=_error(index, f"status: '{task.status}' is not a valid task status")
+                continue
+            valid.append((index, {**task.model_dump(), "owner_id": user.id}))
+
+        if valid:
+            rows=[row for _, row in valid]
+            # Sent as multi-row INSERT ... RETURNING; ids come back in input order.
+            ids=db.execute(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows).scalars().all()
+
+            delta=Counter()
+            for row in rows:
+                delta.update(StatsService.task_delta(row["status"], row["category"], user.id))
+            StatsService.apply(db, delta)
+            TaskVersions.bump_owners(db, [user.id])
+            db.commit()
+            TaskCache.invalidate_owners([user.id])
+            TaskEvents.publish(CREATED, [(id, user.id) for id in ids])
+
+            for (index, _), id in zip(valid, ids):
+                results[index]=BatchItemResult(index=index, id=id, status="created")
+
+        return _summary(results)
+
+    @staticmethod
+    def update_tasks(db: Session, items: list[dict], user: Principal) -> dict:
+        TaskBatchService._check_size(items)
+        results: list[BatchItemResult]=[None] * len(items)
+        parsed: list[tuple[int, TaskBatchUpdate]]=[]
+
+        for index, raw in enumerate(items):
+            try:
+                item=TaskBatchUpdate.model_validate(raw)
+            except ValidationError as exc:
+                results[index]=_error(index, _validation_detail(exc), raw.get("id") if isinstance(raw, dict) else None)
+                continue
+            null_fields=_null_fields_detail(item)
+            if null_fields:
+                results[index]=_error(index, null_fields, item.id)
+                continue
+            parsed.append((index, item))
+
+        existing=TaskBatchService._load_for_write(db, [item.id for _, item in parsed])
+        groups: dict[tuple, list[int]]={}
+        owners: set[int]=set()
+        changed: list[tuple[int, int]]=[]
+        delta=Counter()
+        seen: set[int]=set()
+
+        for index, item in parsed:
+            row=existing.get(item.id)
+            error=TaskBatchService._check_access(index, item.id, row, user, seen, "update")
+            if error:
+                results[index]=error
+                continue
+            seen.add(item.id)
+
+            changes=item.model_dump(exclude_unset=True, exclude={"id"})
+            if changes:
+                # Items asking for the same change share one UPDATE ... WHERE id IN (...).
+                groups.setdefault(tuple(sorted(changes.items())), []).append(item.id)
+                owners.add(row.owner_id)
+                changed.append((item.id, row.owner_id))
+                delta.update(StatsService.task_delta(row.status, row.category, row.owner_id, -1))
+                delta.update(StatsService.task_delta(
+                    changes.get("status", row.status), changes.get("category", row.category), row.owner_id
+                ))
+            results[index]=BatchItemResult(index=index, id=item.id, status="updated")
+
+        for changes, ids in groups.items():
+            db.execute(
+                update(Task).where(Task.id.in_(ids)).values(dict(changes)),
+                execution_options={"synchronize_session": False},
+            )
+        StatsService.apply(db, delta)
+        TaskVersions.bump_owners(db, owners)
+        db.commit()
+        TaskCache.invalidate_owners(owners)
+        TaskEvents.publish(UPDATED, changed)
+        return _summary(results)
+
+    @staticmethod
+    def delete_tasks(db: Session, ids: list[int], user: Principal) -> dict:
+        TaskBatchService._check_size(ids)
+        results: list[BatchItemResult]=[]
+        existing=TaskBatchService._load_for_write(db, ids)
+        allowed: list[int]=[]
+        owners: set[int]=set()
+        delta=Counter()
+        seen: set[int]=set()
+
+        for index, id in enumerate(ids):
+            row=existing.get(id)
+            error=TaskBatchService._check_access(index, id, row, user, seen, "delete")
+            if error:
+                results.append(error)
+                continue
+            seen.add(id)
+            allowed.append(id)
+            owners.add(row.owner_id)
+            delta.update(StatsService.task_delta(row.status, row.category, row.owner_id, -1))
+            results.append(BatchItemResult(index=index, id=id, status="deleted"))
+
+        if allowed:
+            db.execute(delete(Task).where(Task.id.in_(allowed)), execution_options={"synchronize_session": False})
+            StatsService.apply(db, delta)
+        TaskVersions.bump_owners(db, owners)
+        db.commit()
+        TaskCache.invalidate_owners(owners)
+        TaskEvents.publish(DELETED, [(id, existing[id].owner_id) for id in allowed])
+        return _summary(results)
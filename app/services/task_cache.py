@@ -0,0 +1,74 @@
+import uuid
+from typing import Any, Callable, Iterable, Optional
+from app.core import metrics
+from app.core.cache import CacheBackend, MemoryCache
+from app.core.config import settings
+
+cache_requests=metrics.Counter("task_cache_requests_total", "Task read cache lookups by kind and result.")
+
+
+class TaskCache:
+    """Read-through cache of serialized task responses, partitioned by owner.
+
+    Every owner has a generation token that is part of all of their keys.
+    Invalidating an owner swaps in a fresh random token, which orphans all of
+    their cached entries at once without touching other owners; the orphans
+    age out of the LRU. Tokens are never reused, so a stale entry cannot
+    become reachable again even if the token itself is evicted.
+
+    Generation tokens live in the backend, so invalidation reaches exactly
+    the workers that share it. The default MemoryCache is per process: a
+    write only invalidates the worker that made it, and other workers may
+    serve their entries for up to TASK_CACHE_TTL_SECONDS. Multi-worker
+    deployments that need read-your-writes should configure a shared backend.
+
+    Misses must be loaded from the primary: a replica read taken after an
+    invalidation could still be stale, and would be cached as current.
+    """
+
+    backend: CacheBackend=MemoryCache(maxsize=settings.TASK_CACHE_SIZE, ttl=settings.TASK_CACHE_TTL_SECONDS)
+
+    @classmethod
+    def configure(cls, backend: CacheBackend) -> None:
+        cls.backend=backend
+
+    @classmethod
+    def _set_generation(cls, owner_id: int) -> str:
+        generation=uuid.uuid4().hex
+        cls.backend.set(f"tasks:gen:{owner_id}", generation, ttl=settings.TASK_CACHE_TTL_SECONDS * 2)
+        return generation
+
+    @classmethod
+    def _generation(cls, owner_id: int) -> str:
+        return cls.backend.get(f"tasks:gen:{owner_id}") or cls._set_generation(owner_id)
+
+    @classmethod
+    def invalidate_owners(cls, owner_ids: Iterable[Optional[int]]) -> None:
+        for owner_id in set(owner_ids):
+            if owner_id is not None:
+                cls._set_generation(owner_id)
+
+    @classmethod
+    def key(cls, kind: str, owner_id: int, key: str) -> str:
+        # Take the key before loading: a write that commits in the meantime
+        # leaves the loaded value under the old, orphaned generation.
+        return f"tasks:{owner_id}:{cls._generation(owner_id)}:{kind}:{key}"
+
+    @classmethod
+    def get(cls, kind: str, full_key: str) -> Any:
+        value=cls.backend.get(full_key)
+        cache_requests.inc(kind=kind, result="hit" if value is not None else "miss")
+        return value
+
+    @classmethod
+    def set(cls, full_key: str, value: Any) -> Any:
+        cls.backend.set(full_key, value)
+        return value
+
+    @classmethod
+    def get_or_load(cls, kind: str, owner_id: int, key: str, loader: Callable[[], Any]) -> Any:
+        full_key=cls.key(kind, owner_id, key)
+        value=cls.get(kind, full_key)
+        if value is None:
+            value=cls.set(full_key, loader())
+        return value
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core import metrics
+from app.core.config import settings
+from app.core.deadlines import Deadline, DeadlineSink, LogSink, MemorySink, TimerHeap, OVERDUE, REMINDER
+from app.database import SessionLocal, engine
+from app.models.database_models import Task, TaskDeadlineWatermark, TaskStatus
+from app.services.task_cache import TaskCache
+from app.services.task_events import TaskEvents
+from app.utils.sql import AdvisoryLock, upsert
+
+logger=logging.getLogger(__name__)
+
+fired_deadlines=metrics.Counter("task_deadlines_fired_total", "Reminder and overdue events emitted, by kind.")
+pending_deadlines=metrics.Gauge("task_deadlines_pending", "Deadlines loaded into the scheduler's timer heap.")
+
+
+class TaskEventsSink(DeadlineSink):
+    """Publishes deadlines on the task change feed as `reminder`/`overdue` events."""
+
+    def emit(self, deadlines: list[Deadline]) -> None:
+        for kind in (REMINDER, OVERDUE):
+            TaskEvents.publish(kind, [(d.task_id, d.owner_id) for d in deadlines if d.kind==kind])
+
+
+def _build_sink() -> DeadlineSink:
+    if settings.TASK_DUE_SINK=="memory":
+        return MemorySink()
+    if settings.TASK_DUE_SINK=="log":
+        return LogSink()
+    return TaskEventsSink()
+
+
+def _utcnow() -> datetime:
+    # due_date is a naive column holding UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _offsets() -> dict[str, timedelta]:
+    """How long before the due date each kind of deadline fires."""
+    offsets={OVERDUE: timedelta(0)}
+    if settings.TASK_DUE_REMINDER_MINUTES > 0:
+        offsets[REMINDER]=timedelta(minutes=settings.TASK_DUE_REMINDER_MINUTES)
+    return offsets
+
+
+class TaskDeadlines:
+    """Fires reminder and overdue events for open tasks with a due date.
+
+    Every TASK_DUE_POLL_SECONDS the scheduler reads the deadlines from its
+    watermark up to TASK_DUE_LOOKAHEAD_SECONDS ahead, through the partial
+    index on open tasks' (due_date, id), and keeps them in a timer heap. Only
+    that window is ever read, never the whole table. Due entries are checked
+    against the task again, handed to the sink, and the watermark is stored.
+    Delivery is at least once: after a crash, deadlines fired since the last
+    stored watermark fire again. A due date moved to before the watermark
+    does not fire.
+
+    One worker runs the scheduler at a time; it holds a Postgres advisory
+    lock, and another worker takes over when that lock is released.
+    """
+
+    sink: DeadlineSink=_build_sink()
+    heap=TimerHeap()
+    lock=AdvisoryLock(engine, settings.TASK_DUE_LOCK_KEY)
+    _task: Optional[asyncio.Task]=None
+    _leader=False
+    _truncated=False
+
+    @classmethod
+    def configure(cls, sink: DeadlineSink) -> None:
+        cls.sink=sink
+
+    @staticmethod
+    def _watermarks(db: Session, now: datetime) -> dict[str, tuple[datetime, int]]:
+        rows={row.kind: (row.fire_at, row.task_id) for row in db.query(TaskDeadlineWatermark)}
+        missing=[kind for kind in _offsets() if kind not in rows]
+        if missing:
+            # First run: start from now instead of firing every past deadline.
+            stmt=upsert(db, TaskDeadlineWatermark).values([{"kind": kind, "fire_at": now, "task_id": 0} for kind in missing])
+            db.execute(stmt.on_conflict_do_nothing(index_elements=[TaskDeadlineWatermark.kind]))
+            db.commit()
+            return TaskDeadlines._watermarks(db, now)
+        return rows
+
+    @classmethod
+    def load_window(cls, db: Session, now: datetime) -> None:
+        """Refill the heap with deadlines from each watermark up to the lookahead horizon."""
+        horizon=now + timedelta(seconds=settings.TASK_DUE_LOOKAHEAD_SECONDS)
+        budget=settings.TASK_DUE_MAX_PENDING
+        deadlines: list[Deadline]=[]
+        truncated=False
+        for kind, (fire_at, task_id) in cls._watermarks(db, now).items():
+            offset=_offsets().get(kind)
+            if offset is None:
+                continue
+            after=(fire_at + offset, task_id)
+            while budget > 0:
+                rows=db.execute(
+                    select(Task.id, Task.owner_id, Task.due_date)
+                    .where(
+                        Task.status!=TaskStatus.DONE, Task.due_date.is_not(None),
+                        tuple_(Task.due_date, Task.id) > after, Task.due_date <= horizon + offset,
+                    )
+                    .order_by(Task.due_date, Task.id)
+                    .limit(min(settings.TASK_DUE_BATCH_SIZE, budget))
+                ).all()
+                deadlines.extend(Deadline(due_date - offset, kind, id, owner_id, due_date) for id, owner_id, due_date in rows)
+                budget-=len(rows)
+                if len(rows) < settings.TASK_DUE_BATCH_SIZE:
+                    break
+                after=(rows[-1].due_date, rows[-1].id)
+            else:
+                truncated=True
+        cls.heap.replace(deadlines)
+        cls._truncated=truncated
+        pending_deadlines.set(len(cls.heap))
+
+    @classmethod
+    def fire_due(cls, db: Session, now: datetime) -> int:
+        """Emit the deadlines due at `now` that still apply; returns how many fired."""
+        fired=0
+        while True:
+            due=cls.heap.pop_due(now, settings.TASK_DUE_BATCH_SIZE)
+            if not due:
+                break
+            # The heap may be up to a poll old; skip tasks since finished, rescheduled or removed.
+            current={
+                row.id: row.due_date
+                for row in db.execute(
+                    select(Task.id, Task.due_date).where(Task.id.in_({d.task_id for d in due}), Task.status!=TaskStatus.DONE)
+                )
+            }
+            live=[d for d in due if current.get(d.task_id)==d.due_date]
+            if live:
+                cls.sink.emit(live)
+            for kind in {d.kind for d in due}:
+                last=max(d for d in due if d.kind==kind)
+                db.execute(
+                    upsert(db, TaskDeadlineWatermark).values(kind=kind, fire_at=last.fire_at, task_id=last.task_id)
+                    .on_conflict_do_update(index_elements=[TaskDeadlineWatermark.kind], set_={"fire_at": last.fire_at, "task_id": last.task_id})
+                )
+            db.commit()
+            # Overdue counts in cached /my-tasks/summary responses change now.
+            # Only the leader runs this: with the per-process cache backend,
+            # other workers' summaries catch up within TASK_CACHE_TTL_SECONDS.
+            TaskCache.invalidate_owners(d.owner_id for d in live if d.kind==OVERDUE)
+            for deadline in live:
+                fired_deadlines.inc(kind=deadline.kind)
+            fired+=len(live)
+        pending_deadlines.set(len(cls.heap))
+        return fired
+
+    @classmethod
+    def poll(cls) -> None:
+        was_leader=cls._leader
+        cls._leader=cls.lock.acquire()
+        if cls._leader!=was_leader:
+            logger.info("Due-date scheduler %s", "leading" if cls._leader else "standing by")
+        if not cls._leader:
+            cls.heap.replace([])
+            return
+        db=SessionLocal()
+        try:
+            cls.load_window(db, _utcnow())
+        finally:
+            db.close()
+
+    @classmethod
+    def tick(cls) -> None:
+        db=SessionLocal()
+        try:
+            cls.fire_due(db, _utcnow())
+        finally:
+            db.close()
+
+    @classmethod
+    async def _run(cls) -> None:
+        next_poll=0.0
+        while True:
+            try:
+                if time.monotonic() >= next_poll or (cls._truncated and not len(cls.heap)):
+                    await run_in_threadpool(cls.poll)
+                    next_poll=time.monotonic() + settings.TASK_DUE_POLL_SECONDS
+                if cls._leader:
+                    await run_in_threadpool(cls.tick)
+            except Exception:
+                logger.exception("Due-date scheduler failed")
+            delay=next_poll - time.monotonic()
+            next_at=cls.heap.next_at()
+            if next_at is not None:
+                delay=min(delay, (next_at - _utcnow()).total_seconds())
+            await asyncio.sleep(max(delay, 0.05))
+
+    @classmethod
+    def start(cls) -> None:
+        cls._task=asyncio.create_task(cls._run(), name="task-deadlines")
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        await asyncio.gather(cls._task, return_exceptions=True)
+        cls._task=None
+        cls._leader=False
+        await run_in_threadpool(cls.lock.release)
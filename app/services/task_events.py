@@ -0,0 +1,91 @@
+import json
+import time
+from typing import AsyncIterator, Callable, Iterable, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.events import EventBroker, EventTransport, MemoryTransport, Overflowed, PostgresTransport
+from app.database import engine
+
+CREATED="created"
+UPDATED="updated"
+DELETED="deleted"
+ARCHIVED="archived"
+
+
+def _sse(event: str, data: dict, id: str = None) -> bytes:
+    lines=[f"id: {id}"] if id else []
+    lines+=[f"event: {event}", f"data: {json.dumps(data, separators=(',', ':'))}"]
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def _build_transport() -> EventTransport:
+    broker=EventBroker(settings.TASK_EVENTS_BUFFER_SIZE, settings.TASK_EVENTS_QUEUE_SIZE)
+    if settings.TASK_EVENTS_BACKEND=="postgres":
+        return PostgresTransport(broker, engine, settings.TASK_EVENTS_CHANNEL)
+    return MemoryTransport(broker)
+
+
+class TaskEvents:
+    """Change feed for tasks, published by the task services after commit.
+
+    Events are notifications ({"type", "task_id", "owner_id"}); clients that
+    need the new state fetch it with a conditional GET, which the read cache
+    and ETags make cheap.
+    """
+
+    transport: EventTransport=_build_transport()
+
+    @classmethod
+    def configure(cls, transport: EventTransport) -> None:
+        cls.transport=transport
+
+    @classmethod
+    def publish(cls, type: str, changes: Iterable[tuple[int, int]]) -> None:
+        """Publish one event per (task_id, owner_id) pair."""
+        cls.transport.publish([
+            {"type": type, "task_id": task_id, "owner_id": owner_id}
+            for task_id, owner_id in changes
+        ])
+
+    @classmethod
+    async def stream(cls, owner_id: Optional[int], last_event_id: Optional[str] = None, authorize: Callable[[], bool] = None) -> AsyncIterator[bytes]:
+        """SSE frames for one owner's tasks, or for all tasks when `owner_id` is None.
+
+        A `reset` event means events were missed (the resume point is gone or
+        the client was too slow) and the client should reload its task list.
+        `authorize` is re-run (on a worker thread) every keep-alive interval;
+        the stream ends once it returns False.
+        """
+        broker=cls.transport.broker
+
+        def match(event: dict) -> bool:
+            return owner_id is None or event["owner_id"]==owner_id
+
+        subscription, resync=broker.subscribe(match, last_event_id)
+        try:
+            yield f"retry: {settings.TASK_EVENTS_RETRY_MS}\n\n".encode()
+            if resync:
+                yield _sse("reset", {})
+            next_check=time.monotonic() + settings.TASK_EVENTS_KEEPALIVE_SECONDS
+            while True:
+                if authorize is not None and time.monotonic() >= next_check:
+                    if not await run_in_threadpool(authorize):
+                        return
+                    next_check=time.monotonic() + settings.TASK_EVENTS_KEEPALIVE_SECONDS
+                try:
+                    item=await subscription.next(settings.TASK_EVENTS_KEEPALIVE_SECONDS)
+                except Overflowed:
+                    # Fell behind: resume from the last delivered id, or resync
+                    # if the ring buffer has already moved past it.
+                    broker.unsubscribe(subscription)
+                    subscription, resync=broker.subscribe(match, last_event_id)
+                    if resync:
+                        yield _sse("reset", {})
+                    continue
+                if item is None:
+                    yield b": keep-alive\n\n"
+                    continue
+                last_event_id, event=item
+                yield _sse(event["type"], event, last_event_id)
+        finally:
+            broker.unsubscribe(subscription)
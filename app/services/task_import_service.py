@@ -0,0 +1,271 @@
+import csv
+import enum
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import IO, Iterator, Optional
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import column, insert, select, table, text, update
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.database_models import Task, TaskImport, TaskImportError, TaskImportStatus, TaskStatus
+from app.models.task import TaskCreate
+from app.services.stats_service import StatsService
+from app.services.task_batch_service import _validation_detail
+from app.services.task_cache import TaskCache
+from app.services.task_events import TaskEvents, CREATED
+from app.services.task_versions import TaskVersions
+from app.utils.pagination import decode_cursor
+from app.utils.security import Principal
+from app.utils.sql import dialect_name
+
+logger=logging.getLogger(__name__)
+
+import_rows=metrics.Counter("task_import_rows_total", "Rows read by bulk task imports, by result.")
+
+FORMATS=("ndjson", "csv")
+IMPORT_COLUMNS=("title", "description", "status", "category", "due_date", "owner_id")
+UPLOAD_COPY_BUFFER=1024 * 1024
+
+# Per-chunk temp table that COPY fills; dropped when the chunk commits.
+staging=table("task_import_staging", *(column(name) for name in IMPORT_COLUMNS))
+
+
+def _copy_value(value) -> str:
+    # COPY text format: \N is NULL; backslashes, tabs and line breaks are escaped.
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        value=value.value
+    elif isinstance(value, datetime):
+        value=value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _records(path: str, fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """(line, record, error) for each row of an upload, read a line at a time."""
+    with open(path, newline="", encoding="utf-8") as file:
+        if fmt=="csv":
+            reader=csv.DictReader(file)
+            for record in reader:
+                # Empty cells mean "not given", so optional fields keep their defaults.
+                yield reader.line_num, {key: value for key, value in record.items() if key and value not in ("", None)}, None
+            return
+        for line, raw in enumerate(file, 1):
+            if not raw.strip():
+                continue
+            try:
+                yield line, json.loads(raw), None
+            except ValueError as exc:
+                yield line, None, f"Invalid JSON: {exc}"
+
+
+def _validate(record, owner_id: int) -> tuple[Optional[dict], Optional[str]]:
+    try:
+        task=TaskCreate.model_validate(record)
+    except ValidationError as exc:
+        return None, _validation_detail(exc)
+    except Exception as exc:
+        # A bad row is recorded against its line; it must not fail the import.
+        logger.warning("Unexpected error validating an import row", exc_info=True)
+        return None, f"Invalid row: {exc}"
+    try:
+        TaskStatus(task.status)
+    except ValueError:
+        return None, f"status: '{task.status}' is not a valid task status"
+    return {**task.model_dump(), "owner_id": owner_id}, None
+
+
+class TaskImportService:
+    """Bulk task uploads, loaded in the background.
+
+    The upload is spooled to a temporary file and read back one line at a
+    time, so memory use depends on TASK_IMPORT_CHUNK_SIZE, not on the file
+    size. Every chunk is validated with the same rules as POST /tasks and
+    written in one transaction: on PostgreSQL with COPY into a temp staging
+    table and a single INSERT ... SELECT, elsewhere with a multi-row INSERT.
+    Progress and rejected rows are stored on the import, so any worker can
+    report them. Chunks committed before a failure stay imported.
+
+    Jobs run on this process's executor only. When a worker starts, imports
+    still PENDING or RUNNING without progress for TASK_IMPORT_STALE_SECONDS
+    are taken to belong to a worker that died, and are marked FAILED.
+    """
+
+    _executor: Optional[ThreadPoolExecutor]=None
+    _lock=threading.Lock()
+    _stopping=threading.Event()
+
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        with TaskImportService._lock:
+            if TaskImportService._executor is None:
+                TaskImportService._executor=ThreadPoolExecutor(max_workers=settings.TASK_IMPORT_WORKERS, thread_name_prefix="task-import")
+            return TaskImportService._executor
+
+    @staticmethod
+    def start(db: Session, user: Principal, upload: IO[bytes], fmt: str) -> TaskImport:
+        if fmt not in FORMATS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported import format; use one of: {', '.join(FORMATS)}.")
+        with tempfile.NamedTemporaryFile(dir=settings.TASK_IMPORT_DIR, prefix="task-import-", suffix=f".{fmt}", delete=False) as spooled:
+            shutil.copyfileobj(upload, spooled, UPLOAD_COPY_BUFFER)
+
+        job=TaskImport(owner_id=user.id, format=fmt, status=TaskImportStatus.PENDING)
+        db.add(job)
+        db.commit()
+        try:
+            TaskImportService._get_executor().submit(TaskImportService.run, job.id, spooled.name)
+        except RuntimeError:
+            # The executor is shutting down; don't leave the job PENDING forever.
+            os.unlink(spooled.name)
+            TaskImportService._finish(db, job.id, TaskImportStatus.FAILED, "Server is shutting down")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Imports are not being accepted right now, please retry shortly.")
+        return job
+
+    @staticmethod
+    def get(db: Session, id: int, user: Principal) -> TaskImport:
+        job=db.get(TaskImport, id)
+        if job is None or (job.owner_id!=user.id and not user.is_active_admin):
+            raise HTTPException(status_code=404, detail="Import not found")
+        return job
+
+    @staticmethod
+    def get_errors(db: Session, id: int, user: Principal, limit: int, cursor: str = None) -> list[TaskImportError]:
+        TaskImportService.get(db, id, user)
+        query=db.query(TaskImportError).filter(TaskImportError.import_id==id)
+        if cursor:
+            query=query.filter(TaskImportError.id > decode_cursor(cursor))
+        return query.order_by(TaskImportError.id).limit(limit).all()
+
+    @staticmethod
+    def _insert_rows(db: Session, rows: list[dict]) -> list[int]:
+        if dialect_name(db)!="postgresql":
+            return db.execute(insert(Task).returning(Task.id), rows).scalars().all()
+
+        buffer=io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(row[name]) for name in IMPORT_COLUMNS) + "\n")
+        buffer.seek(0)
+        db.execute(text(
+            f"CREATE TEMP TABLE task_import_staging ON COMMIT DROP AS "
+            f"SELECT {', '.join(IMPORT_COLUMNS)} FROM tasks WITH NO DATA"
+        ))
+        with db.connection().connection.driver_connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY task_import_staging ({', '.join(IMPORT_COLUMNS)}) FROM STDIN", buffer)
+        return db.execute(
+            insert(Task).from_select(IMPORT_COLUMNS, select(staging)).returning(Task.id)
+        ).scalars().all()
+
+    @staticmethod
+    def _load_chunk(db: Session, job_id: int, owner_id: int, rows: list[dict], errors: list[tuple[int, str]], processed: int) -> None:
+        ids=TaskImportService._insert_rows(db, rows) if rows else []
+        if rows:
+            delta=Counter()
+            for row in rows:
+                delta.update(StatsService.task_delta(row["status"], row["category"], owner_id))
+            StatsService.apply(db, delta)
+            TaskVersions.bump_owners(db, [owner_id])
+
+        job=db.get(TaskImport, job_id)
+        room=max(settings.TASK_IMPORT_MAX_ERRORS - job.rows_failed, 0)
+        if errors[:room]:
+            db.execute(insert(TaskImportError), [{"import_id": job_id, "line": line, "detail": detail} for line, detail in errors[:room]])
+        job.rows_processed+=processed
+        job.rows_imported+=len(ids)
+        job.rows_failed+=len(errors)
+        db.commit()
+
+        import_rows.inc(len(ids), result="imported")
+        import_rows.inc(len(errors), result="rejected")
+        if ids:
+            TaskCache.invalidate_owners([owner_id])
+            TaskEvents.publish(CREATED, [(id, owner_id) for id in ids])
+
+    @staticmethod
+    def _finish(db: Session, job_id: int, job_status: TaskImportStatus, error: str = None) -> None:
+        db.execute(
+            update(TaskImport).where(TaskImport.id==job_id)
+            .values(status=job_status, error=error, finished_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+
+    @staticmethod
+    def run(job_id: int, path: str) -> None:
+        """Import the spooled upload at `path`, one chunk per transaction."""
+        db=SessionLocal()
+        try:
+            # Claim the job, unless startup already failed it as orphaned.
+            claimed=db.execute(
+                update(TaskImport).where(TaskImport.id==job_id, TaskImport.status==TaskImportStatus.PENDING)
+                .values(status=TaskImportStatus.RUNNING)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return
+            job=db.get(TaskImport, job_id)
+            owner_id, fmt=job.owner_id, job.format
+
+            rows: list[dict]=[]
+            errors: list[tuple[int, str]]=[]
+            processed=0
+            for line, record, error in _records(path, fmt):
+                if TaskImportService._stopping.is_set():
+                    raise RuntimeError("Interrupted by server shutdown")
+                row, error=_validate(record, owner_id) if error is None else (None, error)
+                if row is None:
+                    errors.append((line, error))
+                else:
+                    rows.append(row)
+                processed+=1
+                if processed==settings.TASK_IMPORT_CHUNK_SIZE:
+                    TaskImportService._load_chunk(db, job_id, owner_id, rows, errors, processed)
+                    rows, errors, processed=[], [], 0
+            TaskImportService._load_chunk(db, job_id, owner_id, rows, errors, processed)
+            TaskImportService._finish(db, job_id, TaskImportStatus.DONE)
+        except Exception as exc:
+            logger.exception("Task import %d failed", job_id)
+            db.rollback()
+            TaskImportService._finish(db, job_id, TaskImportStatus.FAILED, str(exc)[:500])
+        finally:
+            db.close()
+            os.unlink(path)
+
+    @staticmethod
+    def startup() -> None:
+        """Accept imports again and fail the ones orphaned by a worker that died."""
+        TaskImportService._stopping.clear()
+        now=datetime.now(timezone.utc)
+        db=SessionLocal()
+        try:
+            orphaned=db.execute(
+                update(TaskImport)
+                .where(
+                    TaskImport.status.in_([TaskImportStatus.PENDING, TaskImportStatus.RUNNING]),
+                    TaskImport.updated_at < now - timedelta(seconds=settings.TASK_IMPORT_STALE_SECONDS),
+                )
+                .values(status=TaskImportStatus.FAILED, error="Interrupted: the worker running it stopped", finished_at=now)
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if orphaned:
+            logger.warning("Marked %d orphaned task imports as failed", orphaned)
+
+    @staticmethod
+    def shutdown() -> None:
+        # Running and queued imports stop at their next row and are marked FAILED.
+        TaskImportService._stopping.set()
+        with TaskImportService._lock:
+            if TaskImportService._executor is not None:
+                TaskImportService._executor.shutdown(wait=True)
+                TaskImportService._executor=None
@@ -1,81 +1,315 @@
-from app.models.database_models import TaskStatus, Task, User, UserStatus
-from sqlalchemy.orm import Session, joinedload
-from fastapi import HTTPException
-from app.models.task import TaskCreate, TaskUpdate
+from datetime import datetime, timezone
+from typing import Optional
+from app.models.database_models import ArchivedTask, TaskCategory, TaskStatus, Task, User
+from sqlalchemy import DateTime, Integer, String, and_, case, delete, func, literal, select, union_all
+from sqlalchemy.orm import Session, joinedload, load_only
+from fastapi import HTTPException, status as http_status
+from app.models.task import TaskCreate, TaskDue, TaskSummary, TaskUpdate
+from app.utils.security import Principal
+from app.utils.pagination import decode_cursor, next_cursor
+from app.services.search_service import TaskSearch
+from app.services.stats_service import StatsService
+from app.services.task_cache import TaskCache
+from app.services.task_events import TaskEvents, CREATED, UPDATED, DELETED
+from app.services.task_versions import TaskVersions
+from app.utils.etag import etag_matches, matching_task_versions, owner_etag, task_etag
+from app.utils.fieldsets import FULL_TASK_FIELDSET, TaskFieldset
+from app.utils.serialization import task_json, task_list_json
+from app.utils.sql import update_returning
+
+def _owner_column(column):
+    return select(column).where(User.id==Task.owner_id).correlate(Task).scalar_subquery().label(f"owner_{column.key}")
+
+# What an UPDATE ... RETURNING hands back: a whole TaskOut, owner summary included.
+TASK_RETURNING=(Task.title, Task.description, Task.due_date, Task.id, Task.owner_id, Task.status, Task.category, Task.version)
+OWNER_RETURNING=(_owner_column(User.full_name), _owner_column(User.email))
 
 class TaskService:
+    @staticmethod
+    def _query(db: Session, fieldset: TaskFieldset = FULL_TASK_FIELDSET, model=Task):
+        # A full TaskOut embeds the owner, so the owner is joined into the same
+        # SELECT instead of lazy-loaded per row. A sparse fieldset selects only
+        # its own columns and joins the owner only when it is embedded.
+        query=db.query(model)
+        if fieldset.is_full:
+            return query.options(joinedload(model.owner))
+        columns=[getattr(model, name) for name in fieldset.attributes if name in model.__table__.c]
+        if fieldset.status_display:
+            columns.append(model.status)
+        query=query.options(load_only(*columns))
+        if fieldset.embed_owner:
+            query=query.options(joinedload(model.owner).load_only(User.full_name, User.email))
+        return query
+
+    @staticmethod
+    def _load(db: Session, id: int) -> Task:
+        return TaskService._query(db).filter(Task.id==id).one()
+
+    @staticmethod
+    def _writable(id: int, user: Principal) -> list:
+        # The permission check is part of the write's WHERE clause: admins may
+        # change any task, everyone else only their own.
+        criteria=[Task.id==id]
+        if not user.is_active_admin:
+            criteria.append(Task.owner_id==user.id)
+        return criteria
+
+    @staticmethod
+    def _refused(db: Session, id: int, user: Principal, action: str) -> HTTPException:
+        """Why a guarded write matched no row. Only failed writes pay for this lookup."""
+        owner_id=db.scalar(select(Task.owner_id).where(Task.id==id))
+        if owner_id is None:
+            return HTTPException(status_code=404, detail="Task not found")
+        if owner_id!=user.id and not user.is_active_admin:
+            return HTTPException(status_code=403, detail=f"You are not allowed to {action} this task.")
+        return HTTPException(status_code=http_status.HTTP_412_PRECONDITION_FAILED, detail="Task has been modified since it was read.")
+
+    @staticmethod
+    def _returned(row: dict) -> Task:
+        """A detached Task, with its owner summary, built from RETURNING values."""
+        owner=User(full_name=row["owner_full_name"], email=row["owner_email"])
+        return Task(**{column.key: row[column.key] for column in TASK_RETURNING}, owner=owner)
+
+    @staticmethod
+    def _paginate(query, limit: int, skip: int, cursor: str = None, model=Task):
+        # Keyset pagination on the primary key: a cursor page is an index range
+        # scan, so its cost does not grow with how deep the client has paged.
+        query=query.order_by(model.id)
+        if cursor:
+            return query.filter(model.id > decode_cursor(cursor)).limit(limit)
+        return query.offset(skip).limit(limit)
+
+    @staticmethod
+    def _list(db: Session, fieldset: TaskFieldset, criteria, limit: int, skip: int, cursor: str, include_archived: bool) -> list:
+        """A page of tasks matching `criteria(model)`, optionally merged with archived tasks."""
+        if not include_archived:
+            query=TaskService._query(db, fieldset).filter(*criteria(Task))
+            return TaskService._paginate(query, limit, skip, cursor).all()
+
+        # Archived tasks keep their ids, so the merged page is the first
+        # skip + limit rows of each table interleaved by id.
+        fetch=limit if cursor else skip + limit
+        tasks=[]
+        for model in (Task, ArchivedTask):
+            query=TaskService._query(db, fieldset, model).filter(*criteria(model))
+            tasks.extend(TaskService._paginate(query, fetch, 0, cursor, model).all())
+        tasks.sort(key=lambda task: task.id)
+        start=0 if cursor else skip
+        return tasks[start:start + limit]
+
     @staticmethod
     def get_all_tasks(db: Session, 
         search: str = None, 
         status: TaskStatus = None, 
         user_id: int = None, 
         limit: int = 10, 
-        skip: int = 0
+        skip: int = 0,
+        cursor: str = None,
+        fieldset: TaskFieldset = FULL_TASK_FIELDSET,
+        include_archived: bool = False
     ):
-        query=db.query(Task).options(joinedload(Task.owner))
+        def criteria(model):
+            filters=[]
+            if status:
+                filters.append(model.status==status)
+            if user_id:
+                filters.append(model.owner_id==user_id)
+            return filters
 
         if search:
-            query=query.filter(Task.title.ilike(f"%{search}%"))
-
-        if status:
-            query=query.filter(Task.status==status)
-
-        if user_id:
-            query=query.filter(Task.owner_id==user_id)
+            if cursor:
+                raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail="Search results are ranked; page them with skip instead of cursor.")
+            if include_archived:
+                raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail="Search covers live tasks only; it cannot include archived tasks.")
+            query=TaskSearch.apply(db, TaskService._query(db, fieldset).filter(*criteria(Task)), search)
+            return query.offset(skip).limit(limit).all()
         
-        return query.offset(skip).limit(limit).all()
+        return TaskService._list(db, fieldset, criteria, limit, skip, cursor, include_archived)
+    
+    @staticmethod
+    def get_user_tasks(db: Session, user: Principal, limit: int, skip: int, cursor: str = None, fieldset: TaskFieldset = FULL_TASK_FIELDSET, include_archived: bool = False) -> list[Task]:
+        return TaskService._list(db, fieldset, lambda model: [model.owner_id==user.id], limit, skip, cursor, include_archived)
     
     @staticmethod
-    def get_user_tasks(db: Session, user: User, limit: int, skip: int) -> list[Task]:
-        return db.query(Task).filter(Task.owner_id==user.id).offset(skip).limit(limit).all()
+    def get_user_tasks_page(db: Session, user: Principal, limit: int, skip: int, cursor: str = None, if_none_match: str = None, fieldset: TaskFieldset = FULL_TASK_FIELDSET, include_archived: bool = False) -> tuple[str, Optional[bytes], Optional[str]]:
+        """ETag, serialized body and next cursor of a /my-tasks page.
+
+        The body is None when `if_none_match` already names the current
+        version; no task rows are read or serialized for that answer.
+        """
+        key=TaskCache.key("page", user.id, f"{limit}:{skip}:{cursor or ''}:{fieldset.key}:{include_archived:d}")
+        cached=TaskCache.get("page", key)
+        if cached is None:
+            # The version is read before the rows, so a cached ETag can only
+            # lag the body it is stored with, never run ahead of it.
+            variant=fieldset.tag + (".a" if include_archived else "")
+            etag=owner_etag(user.id, TaskVersions.owner_version(db, user.id), variant)
+            if etag_matches(if_none_match, etag):
+                return etag, None, None
+            tasks=TaskService.get_user_tasks(db, user, limit, skip, cursor, fieldset, include_archived)
+            cached=TaskCache.set(key, (etag, task_list_json(tasks, fieldset), next_cursor(tasks, limit)))
+
+        etag, body, page_cursor=cached
+        if etag_matches(if_none_match, etag):
+            return etag, None, None
+        return etag, body, page_cursor
     
     @staticmethod
-    def get_task(id: int, db: Session, user: User):
-        task= db.query(Task).filter(Task.owner_id==user.id, Task.id==id).first()
+    def _summary(db: Session, owner_id: int, next_due: int) -> TaskSummary:
+        # due_date is a naive column holding UTC.
+        now=datetime.now(timezone.utc).replace(tzinfo=None)
+        open_task=Task.status!=TaskStatus.DONE
+        # Group counts and the upcoming tasks come back from one UNION ALL; a
+        # "count" row has no task columns and a "next" row has no counts.
+        counts=(
+            select(
+                literal("count").label("row"), Task.status, Task.category,
+                func.count().label("tasks"), func.sum(case((and_(open_task, Task.due_date < now), 1), else_=0)).label("overdue"),
+                literal(None, Integer).label("id"), literal(None, String).label("title"), literal(None, DateTime).label("due_date"),
+            )
+            .where(Task.owner_id==owner_id)
+            .group_by(Task.status, Task.category)
+        )
+        upcoming=(
+            select(
+                literal("next"), Task.status, Task.category,
+                literal(None, Integer), literal(None, Integer),
+                Task.id, Task.title, Task.due_date,
+            )
+            .where(Task.owner_id==owner_id, open_task, Task.due_date >= now)
+            .order_by(Task.due_date, Task.id)
+            .limit(next_due)
+            .subquery()
+        )
+        rows=db.execute(union_all(counts, select(upcoming))).all()
+
+        by_status=dict.fromkeys(TaskStatus, 0)
+        by_category=dict.fromkeys(TaskCategory, 0)
+        matrix={status: dict.fromkeys(TaskCategory, 0) for status in TaskStatus}
+        overdue=0
+        for row in rows:
+            if row.row=="count":
+                matrix[row.status][row.category]=row.tasks
+                by_status[row.status]+=row.tasks
+                by_category[row.category]+=row.tasks
+                overdue+=row.overdue
+        upcoming_tasks=sorted((row for row in rows if row.row=="next"), key=lambda row: (row.due_date, row.id))
+        return TaskSummary(
+            total=sum(by_status.values()),
+            overdue=overdue,
+            by_status=by_status,
+            by_category=by_category,
+            counts=matrix,
+            next_due=[
+                TaskDue(id=row.id, title=row.title, status=row.status, category=row.category, due_date=row.due_date)
+                for row in upcoming_tasks
+            ],
+        )
+
+    @staticmethod
+    def get_user_summary_json(db: Session, user: Principal, next_due: int, if_none_match: str = None) -> tuple[str, Optional[bytes]]:
+        """ETag and serialized /my-tasks/summary; cached per owner like /my-tasks pages.
+
+        Task writes invalidate it, and so do overdue events from the due-date
+        scheduler. Between those, the overdue count can lag the clock by at
+        most TASK_CACHE_TTL_SECONDS. The body is None when the client's copy
+        is current.
+        """
+        def load() -> tuple[str, bytes]:
+            # Without a write, the summary only changes when a task becomes
+            # overdue, so the overdue count completes the owner's version.
+            version=TaskVersions.owner_version(db, user.id)
+            summary=TaskService._summary(db, user.id, next_due)
+            return owner_etag(user.id, version, f".s{next_due}.{summary.overdue}"), summary.model_dump_json().encode()
+
+        etag, body=TaskCache.get_or_load("summary", user.id, str(next_due), load)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        return etag, body
+
+    @staticmethod
+    def get_task(id: int, db: Session, user: Principal):
+        task= TaskService._query(db).filter(Task.owner_id==user.id, Task.id==id).first()
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
         return task      
+
+    @staticmethod
+    def get_task_json(id: int, db: Session, user: Principal, if_none_match: str = None) -> tuple[str, Optional[bytes]]:
+        """ETag and serialized body of a task; the body is None when the client's copy is current."""
+        key=TaskCache.key("task", user.id, str(id))
+        cached=TaskCache.get("task", key)
+        if cached is None:
+            if if_none_match:
+                version=db.scalar(select(Task.version).where(Task.owner_id==user.id, Task.id==id))
+                if version is None:
+                    raise HTTPException(status_code=404, detail="Task not found")
+                if etag_matches(if_none_match, task_etag(id, version)):
+                    return task_etag(id, version), None
+            task=TaskService.get_task(id, db, user)
+            cached=TaskCache.set(key, (task_etag(task.id, task.version), task_json(task)))
+
+        etag, body=cached
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        return etag, body
     
     @staticmethod
-    def create_task(task_data: TaskCreate, db: Session, current_user: User)->Task:
+    def create_task(task_data: TaskCreate, db: Session, current_user: Principal)->Task:
         new_task=Task(**task_data.model_dump(), owner_id=current_user.id)
         db.add(new_task)
+        StatsService.apply(db, StatsService.task_delta(new_task.status, new_task.category, current_user.id))
+        TaskVersions.bump_owners(db, [current_user.id])
         db.commit()
-        db.refresh(new_task)
-        return new_task
+        TaskCache.invalidate_owners([current_user.id])
+        task=TaskService._load(db, new_task.id)
+        TaskEvents.publish(CREATED, [(task.id, task.owner_id)])
+        return task
     
     @staticmethod
-    def delete_task(db: Session, id: int, user:User)->None:
-        task=db.query(Task).filter(Task.id==id).first()
+    def delete_task(db: Session, id: int, user: Principal)->None:
+        row=db.execute(
+            delete(Task).where(*TaskService._writable(id, user)).returning(Task.owner_id, Task.status, Task.category),
+            execution_options={"synchronize_session": False},
+        ).first()
+        if row is None:
+            raise TaskService._refused(db, id, user, "delete")
 
-        if task is None:
-            raise HTTPException(status_code=404, detail="Task not found")
-        role_name = getattr(user.role, "name", None)
-        if task.owner_id!=user.id and (role_name!="admin" or user.status!=UserStatus.ACTIVE):
-            raise HTTPException(status_code=403, detail="You are not allowed to delete this task.")
-        db.delete(task)
+        StatsService.apply(db, StatsService.task_delta(row.status, row.category, row.owner_id, -1))
+        TaskVersions.bump_owners(db, [row.owner_id])
         db.commit()
+        TaskCache.invalidate_owners([row.owner_id])
+        TaskEvents.publish(DELETED, [(id, row.owner_id)])
         return
     
     @staticmethod
-    def update_task(db: Session, user: User, id: int, task_update: TaskUpdate)-> Task:
-        task= db.query(Task).filter(Task.id==id).first()
+    def update_task(db: Session, user: Principal, id: int, task_update: TaskUpdate, if_match: str = None)-> Task:
+        criteria=TaskService._writable(id, user)
+        versions=matching_task_versions(if_match, id)
+        if versions is not None:
+            # Optimistic concurrency: the version check and the write are one
+            # statement, so a concurrent writer makes this match no row.
+            criteria.append(Task.version.in_(versions))
 
-        if task is None:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        is_owner=task.owner_id==user.id
-        role_name = getattr(user.role, "name", None)
-        is_active_admin=role_name=="admin" and user.status==UserStatus.ACTIVE
+        changes=task_update.model_dump(exclude_unset=True)
+        if not changes:
+            task=TaskService._query(db).filter(*criteria).first()
+            if task is None:
+                raise TaskService._refused(db, id, user, "update")
+            return task
 
-        if not is_owner and not is_active_admin:
-            raise HTTPException(status_code=403, detail="You are not allowed to update this task.")
-        
-        update_data=task_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(task, key, value)
+        # The stat counters need the old status and category only when those change.
+        previous=[Task.status, Task.category] if changes.keys() & {"status", "category"} else []
+        row=update_returning(db, Task, criteria, changes, TASK_RETURNING + OWNER_RETURNING, previous)
+        if row is None:
+            raise TaskService._refused(db, id, user, "update")
 
+        owner_id=row["owner_id"]
+        delta=StatsService.task_delta(row.get("previous_status", row["status"]), row.get("previous_category", row["category"]), owner_id, -1)
+        delta.update(StatsService.task_delta(row["status"], row["category"], owner_id))
+        StatsService.apply(db, delta)
+        TaskVersions.bump_owners(db, [owner_id])
         db.commit()
-        db.refresh(task)
-        return task
-        
+        TaskCache.invalidate_owners([owner_id])
+        TaskEvents.publish(UPDATED, [(id, owner_id)])
+        return TaskService._returned(row)
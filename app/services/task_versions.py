@@ -0,0 +1,27 @@
+from typing import Iterable
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.database_models import User
+
+
+class TaskVersions:
+    """Per-owner version of the task list, used for the /my-tasks ETag.
+
+    Single tasks carry their own `version` column; this counter changes when
+    any task of the owner is created, updated or deleted, in the same
+    transaction as the change.
+    """
+
+    @staticmethod
+    def bump_owners(db: Session, owner_ids: Iterable[int]) -> None:
+        # Sorted so concurrent batches lock the user rows in the same order.
+        ids=sorted({owner_id for owner_id in owner_ids if owner_id is not None})
+        if ids:
+            db.execute(
+                update(User).where(User.id.in_(ids)).values(tasks_version=User.tasks_version + 1),
+                execution_options={"synchronize_session": False},
+            )
+
+    @staticmethod
+    def owner_version(db: Session, owner_id: int) -> int:
+        return db.scalar(select(User.tasks_version).where(User.id==owner_id)) or 0
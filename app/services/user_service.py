@@ -1,48 +1,65 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.models.user import UserCreate
-from app.models.database_models import User, Role, UserStatus, Task, TaskStatus
+from app.models.database_models import User, UserStatus
 from fastapi import HTTPException, status
-from sqlalchemy import func
-from app.utils.security import check_if_admin_exists, hash_password, create_access_token, verify_password
+from sqlalchemy import select
+from app.services.stats_service import StatsService, USERS_BY_STATUS, TASKS_BY_STATUS, TASKS_BY_CATEGORY
+from app.services.refresh_token_service import RefreshTokenService
+from app.utils.pagination import decode_cursor
+from app.utils.roles import RoleRegistry, ADMIN
+from app.utils.sql import update_returning, upsert
+from app.utils.hashing import hash_password, verify_and_update_password
+from app.utils.security import invalidate_principal, Principal
+
+# UserOut's fields, as returned by INSERT/UPDATE ... RETURNING; see _user_row.
+USER_RETURNING=(User.email, User.full_name, User.id, User.role_id, User.status)
+
+def _user_row(db: Session, row: dict) -> dict:
+    row["role"]=RoleRegistry.get_name(db, row.pop("role_id"))
+    return row
 
 class UserService:
     @staticmethod
-    def register(db: Session, user: UserCreate)-> User:
-        existing_user=db.query(User).filter(User.email==user.email).first()
-        if existing_user:
+    def register(db: Session, user: UserCreate)-> dict:
+        # Checked before hashing, so a taken email never costs a bcrypt slot.
+        if db.scalar(select(User.id).where(User.email==user.email)) is not None:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-        
-        requested_role=(user.role or "user").lower()
-        role=db.query(Role).filter(func.lower(Role.name)==requested_role).first()
 
-        if role is None:
+        role_id=RoleRegistry.get_id(db, user.role or "user")
+        if role_id is None:
             raise HTTPException(status_code=500, detail="Role not found.")
-        
-        user_status=UserStatus.ACTIVE
+        role_name=RoleRegistry.get_name(db, role_id)
 
-        if role.name=="admin":
-            if check_if_admin_exists(db):
-                user_status=UserStatus.PENDING
+        user_status=UserStatus.ACTIVE
+        if role_name==ADMIN and RoleRegistry.admin_exists(db):
+            user_status=UserStatus.PENDING
 
-        hashed=hash_password(user.password)
-        new_user=User(
+        # ON CONFLICT only guards against a concurrent registration of the same email.
+        stmt=upsert(db, User).values(
             email=user.email,
-            hashed_password=hashed,
+            hashed_password=hash_password(user.password),
             full_name=user.full_name,
-            role_id=role.id,
-            status=user_status.value
+            role_id=role_id,
+            status=user_status
         )
+        row=db.execute(stmt.on_conflict_do_nothing(index_elements=[User.email]).returning(*USER_RETURNING)).first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-        db.add(new_user)
+        StatsService.apply(db, StatsService.user_delta(None, user_status))
         db.commit()
-        db.refresh(new_user)
-        return new_user
+        if role_name==ADMIN:
+            RoleRegistry.mark_admin_exists()
+        return _user_row(db, dict(row._mapping))
 
     @staticmethod
     def login(db: Session, email: str, password:str)-> dict:
         user=db.query(User).filter(User.email==email).first()
 
-        if user is None or not verify_password(password, user.hashed_password):
+        valid, new_hash=(False, None)
+        if user is not None:
+            valid, new_hash=verify_and_update_password(password, user.hashed_password)
+        if not valid:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Wrong credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
@@ -51,70 +68,75 @@ class UserService:
         
         if user.status==UserStatus.PENDING.value:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Your account is still waiting for an approval. Please be patient.")
-        access_token_data={"sub": user.email, "role":user.role.name}
-        access_token=create_access_token(data=access_token_data)
-        return {
-            "access_token": access_token,
-            "token_type": "bearer"
-        }
+        if new_hash:
+            user.hashed_password=new_hash
+        refresh_token=RefreshTokenService.issue(db, user.id)
+        db.commit()
+        return RefreshTokenService.token_response(user.email, RoleRegistry.get_name(db, user.role_id), refresh_token)
     
     @staticmethod
-    def get_all_users(db:Session)-> list[User]:
-        return db.query(User).all()
+    def get_all_users(db:Session, limit: int = 100, skip: int = 0, cursor: str = None)-> list[User]:
+        query=db.query(User).options(joinedload(User.role)).order_by(User.id)
+        if cursor:
+            return query.filter(User.id > decode_cursor(cursor)).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
     
     @staticmethod
     def get_pending_users(db: Session)->list[User]:
-        return db.query(User).filter(User.status==UserStatus.PENDING.value).all()
+        return db.query(User).options(joinedload(User.role)).filter(User.status==UserStatus.PENDING.value).all()
     
     @staticmethod
-    def process_user(db: Session, user_id: int, approve: bool)-> User:
-        target_user=db.query(User).filter(User.id==user_id).first()
-
-        if target_user is None:
-            raise HTTPException(status_code=404, detail="User for approval does not exist.")
-        if target_user.status == UserStatus.ACTIVE.value:
-            raise HTTPException(status_code=400, detail="User is already active.")
+    def process_user(db: Session, user_id: int, approve: bool)-> dict:
+        values={"status": UserStatus.ACTIVE}
         if not approve:
-            user_role=db.query(Role).filter(func.lower(Role.name)=="user").first()
-            if user_role is None:
+            values["role_id"]=RoleRegistry.get_id(db, "user")
+            if values["role_id"] is None:
                 raise HTTPException(status_code=500, detail="You cannot switch an user to a role that does not exist")
-            target_user.role_id=user_role.id
 
-        target_user.status=UserStatus.ACTIVE.value
+        row=update_returning(db, User, [User.id==user_id, User.status!=UserStatus.ACTIVE], values, USER_RETURNING, previous=[User.status])
+        if row is None:
+            # Only a refused update pays for finding out why.
+            if db.scalar(select(User.id).where(User.id==user_id)) is None:
+                raise HTTPException(status_code=404, detail="User for approval does not exist.")
+            raise HTTPException(status_code=400, detail="User is already active.")
 
+        StatsService.apply(db, StatsService.user_delta(row.pop("previous_status"), UserStatus.ACTIVE))
         db.commit()
-        db.refresh(target_user)
-        return target_user
+        invalidate_principal(row["email"])
+        return _user_row(db, row)
     
     @staticmethod
     def get_admin_data(db: Session)->dict:
-        total_users=db.query(User).count()
-        user_stats_raw=db.query(User.status, func.count(User.id)).group_by(User.status).all()
-        users_by_status={status.value: count for status, count in user_stats_raw}
-
-        total_tasks=db.query(Task).count()
-        task_stats_raw=db.query(Task.status, func.count(Task.id)).group_by(Task.status).all()
-        tasks_by_status={status.value: count for status, count in task_stats_raw}
+        counters=StatsService.read(db, USERS_BY_STATUS, TASKS_BY_STATUS, TASKS_BY_CATEGORY)
+        users_by_status=counters[USERS_BY_STATUS]
+        tasks_by_status=counters[TASKS_BY_STATUS]
 
         return {
-            "total_users": total_users,
+            "total_users": sum(users_by_status.values()),
             "users_by_status": users_by_status,
-            "total_tasks": total_tasks,
-            "tasks_by_status": tasks_by_status
+            "total_tasks": sum(tasks_by_status.values()),
+            "tasks_by_status": tasks_by_status,
+            "tasks_by_category": counters[TASKS_BY_CATEGORY]
         }  
+
+    @staticmethod
+    def get_user_stats(db: Session, user_id: int)->dict:
+        return {
+            "user_id": user_id,
+            "total_tasks": StatsService.owner_task_count(db, user_id)
+        }
     
     @staticmethod
-    def archive_user(db: Session, user_id: int, admin:User)->User:
+    def archive_user(db: Session, user_id: int, admin: Principal)->dict:
         if user_id == admin.id:
             raise HTTPException(status_code=400, detail="You cannot archive your own account.")
     
-        target_user=db.query(User).filter(User.id==user_id).first()
-
-        if target_user is None:
+        row=update_returning(db, User, [User.id==user_id], {"status": UserStatus.ARCHIVED}, USER_RETURNING, previous=[User.status])
+        if row is None:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        target_user.status=UserStatus.ARCHIVED.value
+
+        StatsService.apply(db, StatsService.user_delta(row.pop("previous_status"), UserStatus.ARCHIVED))
+        RefreshTokenService.revoke_user(db, user_id)
         db.commit()
-        db.refresh(target_user)
-        return target_user
-        
\ No newline at end of file
+        invalidate_principal(row["email"])
+        return _user_row(db, row)
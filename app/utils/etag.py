@@ -0,0 +1,46 @@
+from typing import Optional
+
+
+def task_etag(id: int, version: int) -> str:
+    return f'"t{id}.{version}"'
+
+
+def owner_etag(owner_id: int, version: int, variant: str = "") -> str:
+    # `variant` tells apart representations of the same version, such as sparse fieldsets.
+    return f'"u{owner_id}.{version}{variant}"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """Whether an If-None-Match (weak comparison) or If-Match (weak=False) header names `etag`."""
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag=tag.strip()
+        if tag=="*":
+            return True
+        if tag.startswith("W/"):
+            if not weak:
+                continue
+            tag=tag[2:]
+        if tag==etag:
+            return True
+    return False
+
+
+def matching_task_versions(header: Optional[str], id: int) -> Optional[set[int]]:
+    """Versions of task `id` an If-Match header accepts; None when it accepts any.
+
+    Lets the version check run inside the UPDATE instead of after a SELECT.
+    Weak tags never match, as If-Match uses strong comparison.
+    """
+    if not header:
+        return None
+    prefix=f'"t{id}.'
+    versions=set()
+    for tag in header.split(","):
+        tag=tag.strip()
+        if tag=="*":
+            return None
+        if tag.startswith(prefix) and tag.endswith('"') and tag[len(prefix):-1].isdigit():
+            versions.add(int(tag[len(prefix):-1]))
+    return versions
@@ -0,0 +1,79 @@
+"""Sparse fieldsets for task list endpoints.
+
+`?fields=id,title,status` limits a TaskOut to the named fields and
+`?embed=owner` adds the owner summary. Without `fields`, tasks keep every
+field and the owner is embedded unless `embed` is given without it. `id` is
+always included, since cursor pagination is keyed on it.
+"""
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, status
+from app.models.task import TaskOut
+
+OWNER="owner"
+STATUS_DISPLAY_FIELD="status_display"
+
+# Selectable fields in TaskOut order; "owner" is requested through `embed`.
+TASK_FIELDS=tuple(name for name in (*TaskOut.model_fields, *TaskOut.model_computed_fields) if name!=OWNER)
+TASK_EMBEDS=(OWNER,)
+
+
+@dataclass(frozen=True)
+class TaskFieldset:
+    fields: tuple[str, ...]
+    embed_owner: bool
+
+    @property
+    def attributes(self) -> tuple[str, ...]:
+        """Task attributes to copy, in TaskOut order, with "owner" in its place."""
+        return tuple(name for name in TaskOut.model_fields if name in self.fields or (name==OWNER and self.embed_owner))
+
+    @property
+    def status_display(self) -> bool:
+        return STATUS_DISPLAY_FIELD in self.fields
+
+    @property
+    def is_full(self) -> bool:
+        return self==FULL_TASK_FIELDSET
+
+    @property
+    def key(self) -> str:
+        return ",".join(self.fields) + (f"+{OWNER}" if self.embed_owner else "")
+
+    @property
+    def tag(self) -> str:
+        """Short suffix that keeps ETags of different fieldsets apart; empty for the full TaskOut."""
+        return "" if self.is_full else f".f{zlib.crc32(self.key.encode()):08x}"
+
+
+FULL_TASK_FIELDSET=TaskFieldset(fields=TASK_FIELDS, embed_owner=True)
+
+
+def _split(value: str) -> set[str]:
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def parse_task_fieldset(fields: Optional[str], embed: Optional[str]) -> TaskFieldset:
+    embeds=_split(embed) if embed is not None else None
+    if embeds and not embeds <= set(TASK_EMBEDS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown embed {', '.join(sorted(embeds - set(TASK_EMBEDS)))}; allowed: {', '.join(TASK_EMBEDS)}.",
+        )
+    if fields is None:
+        embed_owner=embeds is None or OWNER in embeds
+        return FULL_TASK_FIELDSET if embed_owner else TaskFieldset(fields=TASK_FIELDS, embed_owner=False)
+
+    requested=_split(fields)
+    unknown=requested - set(TASK_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field {', '.join(sorted(unknown))}; allowed: {', '.join(TASK_FIELDS)}.",
+        )
+    requested.add("id")
+    return TaskFieldset(
+        fields=tuple(name for name in TASK_FIELDS if name in requested),
+        embed_owner=embeds is not None and OWNER in embeds,
+    )
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+from app.core import metrics
+
+# min/max pin the cost factor, so hashes made with any other cost are reported
+# by needs_update() and get rehashed on the next successful login.
+pwd_context=CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+hash_queue_depth=metrics.Gauge("password_hash_queue_depth", "Password hash jobs queued or running.")
+hash_latency=metrics.Histogram("password_hash_seconds", "Time spent waiting for and computing password hashes.")
+hash_rejected=metrics.Counter("password_hash_rejected_total", "Password hash jobs shed because the queue was full.")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class HashingExecutor:
+    def __init__(self, kind: str, workers: int, queue_size: int):
+        self.kind=kind
+        self.workers=workers or os.cpu_count() or 1
+        self._slots=threading.BoundedSemaphore(self.workers + queue_size)
+        self._pool: Optional[Executor]=None
+        self._lock=threading.Lock()
+
+    def _get_pool(self) -> Optional[Executor]:
+        if self.kind=="inline":
+            return None
+        with self._lock:
+            if self._pool is None:
+                if self.kind=="process":
+                    self._pool=ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._pool=ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+            return self._pool
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            hash_rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent logins, please retry shortly.",
+                headers={"Retry-After": str(settings.HASH_RETRY_AFTER_SECONDS)},
+            )
+        hash_queue_depth.inc()
+        start=time.perf_counter()
+        try:
+            pool=self._get_pool()
+            if pool is None:
+                return fn(*args)
+            return pool.submit(fn, *args).result()
+        finally:
+            hash_latency.observe(time.perf_counter() - start)
+            hash_queue_depth.dec()
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool=None
+
+
+executor=HashingExecutor(settings.HASH_EXECUTOR, settings.HASH_WORKERS, settings.HASH_QUEUE_SIZE)
+
+
+def hash_password(password: str) -> str:
+    return executor.run(_hash, password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return executor.run(_verify_and_update, plain_password, hashed_password)
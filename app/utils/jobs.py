@@ -0,0 +1,34 @@
+import asyncio
+import logging
+from typing import Callable
+from starlette.concurrency import run_in_threadpool
+
+logger=logging.getLogger(__name__)
+
+
+async def _run_every(name: str, interval: float, job: Callable[[], None]) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(job)
+        except Exception:
+            logger.exception("Background job %s failed", name)
+
+
+class BackgroundJobs:
+    """Periodic blocking jobs started from the lifespan hook and cancelled on shutdown."""
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task]=[]
+
+    def every(self, name: str, interval: float, job: Callable[[], None]) -> None:
+        if interval <= 0:
+            logger.info("Background job %s disabled", name)
+            return
+        self._tasks.append(asyncio.create_task(_run_every(name, interval, job), name=name))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Optional, Sequence
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER="X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw=json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded=cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+
+def check_pagination(skip: int, cursor: Optional[str]) -> None:
+    if cursor and skip:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either skip or cursor, not both.")
+
+
+def next_cursor(items: Sequence, limit: int) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this was the last page."""
+    if len(items) < limit:
+        return None
+    return encode_cursor(items[-1].id)
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.database import engine as default_engine
+
+
+class QueryCount:
+    def __init__(self):
+        self.statements: list[str]=[]
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine]=None) -> Iterator[QueryCount]:
+    """Record every SQL statement `engine` executes inside the block."""
+    engine=engine or default_engine
+    counter=QueryCount()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine: Optional[Engine]=None) -> Iterator[QueryCount]:
+    """Fail when the block emits more than `limit` statements.
+
+    Meant for tests guarding against N+1 regressions::
+
+        with assert_max_queries(2):
+            client.get("/my-tasks?limit=100", headers=auth)
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing="\n".join(f"  {statement}" for statement in counter.statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {counter.count}:\n{listing}")
@@ -0,0 +1,91 @@
+"""In-process copy of the roles table.
+
+Roles are a handful of rows that change only with a migration or
+seed_roles, so they are read once at startup (see app.main) and resolved
+from memory afterwards. A name or id that is not known yet reloads the
+registry, at most once per ROLE_REGISTRY_RELOAD_SECONDS, to pick up roles
+added by another process.
+
+The registry also remembers whether any admin exists. Admins are never
+deleted, so once set the flag stays true; while it is false, callers
+confirm it against the database.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.database_models import Role, User
+
+logger=logging.getLogger(__name__)
+
+ADMIN="admin"
+
+
+class RoleRegistry:
+    _ids: dict[str, int]={}
+    _names: dict[int, str]={}
+    _admin_exists=False
+    _loaded_at=float("-inf")
+    _lock=threading.Lock()
+
+    @classmethod
+    def load(cls, db: Session) -> None:
+        rows=db.execute(select(Role.id, Role.name)).all()
+        admin_ids=[id for id, name in rows if name==ADMIN]
+        admin_exists=bool(admin_ids) and db.scalar(select(User.id).where(User.role_id.in_(admin_ids)).limit(1)) is not None
+        with cls._lock:
+            # Lowercased keys make name lookups case-insensitive, as registration always was.
+            cls._ids={name.lower(): id for id, name in rows}
+            cls._names={id: name for id, name in rows}
+            cls._admin_exists=cls._admin_exists or admin_exists
+            cls._loaded_at=time.monotonic()
+        logger.info("Loaded %d roles", len(rows))
+
+    @classmethod
+    def reload(cls) -> None:
+        db=SessionLocal()
+        try:
+            cls.load(db)
+        finally:
+            db.close()
+
+    @classmethod
+    def _reload_if_stale(cls, db: Session) -> bool:
+        if time.monotonic() - cls._loaded_at < settings.ROLE_REGISTRY_RELOAD_SECONDS:
+            return False
+        cls.load(db)
+        return True
+
+    @classmethod
+    def get_id(cls, db: Session, name: str) -> Optional[int]:
+        """Id of the role called `name` (any case), or None if there is none."""
+        id=cls._ids.get(name.lower())
+        if id is None and cls._reload_if_stale(db):
+            id=cls._ids.get(name.lower())
+        return id
+
+    @classmethod
+    def get_name(cls, db: Session, role_id: Optional[int]) -> Optional[str]:
+        if role_id is None:
+            return None
+        name=cls._names.get(role_id)
+        if name is None and cls._reload_if_stale(db):
+            name=cls._names.get(role_id)
+        return name
+
+    @classmethod
+    def admin_exists(cls, db: Session) -> bool:
+        if cls._admin_exists:
+            return True
+        admin_id=cls.get_id(db, ADMIN)
+        if admin_id is not None and db.scalar(select(User.id).where(User.role_id==admin_id).limit(1)) is not None:
+            cls.mark_admin_exists()
+        return cls._admin_exists
+
+    @classmethod
+    def mark_admin_exists(cls) -> None:
+        cls._admin_exists=True
@@ -1,14 +1,18 @@
-from passlib.context import CryptContext
 import jwt
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, Depends, status
-from app.models.database_models import User, Role, UserStatus
-from app.database import get_db
+from app.models.database_models import User, UserStatus
+from app.database import SessionLocal, get_db
 from app.core.config import settings
+from app.core.cache import CacheBackend, MemoryCache
+from app.utils.hashing import verify_and_update_password
+from app.utils.roles import RoleRegistry
 
 load_dotenv()
 
@@ -18,13 +22,39 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-pwd_context=CryptContext(schemes=["bcrypt"], deprecated="auto")
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    full_name: Optional[str]
+    role_name: Optional[str]
+    status: UserStatus
 
-def hash_password(password:str) -> str:
-    return pwd_context.hash(password)
+    @property
+    def is_active_admin(self) -> bool:
+        return self.role_name=="admin" and self.status==UserStatus.ACTIVE
+
+# Principals are keyed by token subject and invalidated by UserService whenever
+# a user's role or status changes. Swap the backend via configure_principal_cache
+# to share it between workers.
+principal_cache: CacheBackend=MemoryCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+# Decoded subjects of already-verified tokens, kept until the token expires.
+_verified_tokens=MemoryCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def configure_principal_cache(backend: CacheBackend) -> None:
+    global principal_cache
+    principal_cache=backend
+
+def _principal_key(email: str) -> str:
+    return f"principal:{email}"
+
+def invalidate_principal(email: str) -> None:
+    principal_cache.delete(_principal_key(email))
 
 def verify_password(plain_password:str, hashed_password:str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    valid, _ = verify_and_update_password(plain_password, hashed_password)
+    return valid
 
 def create_access_token(data:dict, expires_delta: Optional[timedelta] = None):
     to_encode=data.copy()
@@ -37,29 +67,46 @@ def create_access_token(data:dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_access_token(token:str):
+    email=_verified_tokens.get(token)
+    if email is not None:
+        return email
     try:
         payload=jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             return None 
+        _verified_tokens.set(token, email, ttl=payload["exp"] - time.time())
         return email
     except Exception:
         return None
+
+def load_principal(db: Session, email: str) -> Optional[Principal]:
+    principal=principal_cache.get(_principal_key(email))
+    if principal is not None:
+        return principal
+
+    row=db.query(User.id, User.email, User.full_name, User.status, User.role_id).filter(User.email==email).first()
+    if row is None:
+        return None
+
+    principal=Principal(id=row[0], email=row[1], full_name=row[2], status=row[3], role_name=RoleRegistry.get_name(db, row[4]))
+    principal_cache.set(_principal_key(email), principal)
+    return principal
     
-async def get_current_user(token: str=Depends(oauth2_scheme), db: Session=Depends(get_db)) -> User:
+def get_current_user(token: str=Depends(oauth2_scheme), db: Session=Depends(get_db)) -> Principal:
     email=verify_access_token(token)
     if email is None:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
     
-    user=db.query(User).filter(User.email==email).first()
+    principal=load_principal(db, email)
 
-    if user is None:
+    if principal is None:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return user
+    return principal
 
-def admin_required(current_user: User=Depends(get_current_user)):
-    if current_user.role.name !="admin":
+def admin_required(current_user: Principal=Depends(get_current_user)):
+    if current_user.role_name !="admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not authorized for this action. Required role: ADMIN."
@@ -72,5 +119,17 @@ def admin_required(current_user: User=Depends(get_current_user)):
     
     return current_user
 
-def check_if_admin_exists(db: Session)->bool:
-    return db.query(User).join(Role).filter(Role.name == "admin").first() is not None
\ No newline at end of file
+def may_follow_changes(principal: Optional[Principal], admin: bool = False) -> bool:
+    """Whether `principal` may (still) follow a task change feed; archived users may not."""
+    if principal is None or principal.status==UserStatus.ARCHIVED:
+        return False
+    return principal.is_active_admin if admin else True
+
+def recheck_follower(email: str, admin: bool = False) -> bool:
+    """may_follow_changes for a stream opened earlier; cached principals are
+    dropped by invalidate_principal, so archival and role changes show up here."""
+    db=SessionLocal()
+    try:
+        return may_follow_changes(load_principal(db, email), admin)
+    finally:
+        db.close()
\ No newline at end of file
@@ -1,6 +1,8 @@
 import logging
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.database_models import Role
+from app.utils.roles import RoleRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -9,13 +11,14 @@ def seed_roles(db: Session):
     required_roles = ["admin", "user"]
     
     try:
+        existing = set(db.scalars(select(Role.name).where(Role.name.in_(required_roles))))
         for role_name in required_roles:
-            role_exists = db.query(Role).filter(Role.name == role_name).first()
-            if not role_exists:
+            if role_name not in existing:
                 db.add(Role(name=role_name))
                 logger.info(f"Adding role: {role_name}")
         
         db.commit()
+        RoleRegistry.load(db)
     except Exception as e:
         db.rollback()
         logger.error(f"Error seeding roles: {e}")
\ No newline at end of file
@@ -0,0 +1,103 @@
+import logging
+from typing import Optional, Sequence
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+logger=logging.getLogger(__name__)
+
+_DIALECT_INSERTS={
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_name(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def upsert(db: Session, table):
+    """INSERT construct for the session's dialect that supports ON CONFLICT clauses."""
+    insert_fn=_DIALECT_INSERTS.get(dialect_name(db))
+    if insert_fn is None:
+        raise NotImplementedError(f"ON CONFLICT is not supported on {dialect_name(db)}")
+    return insert_fn(table)
+
+
+def update_returning(db: Session, model, where: Sequence, values: dict, returning: Sequence, previous: Sequence=()) -> Optional[dict]:
+    """UPDATE the row of `model` matching `where` and return `returning` as a dict, or None if no row matched.
+
+    Columns in `previous` are returned as well, as "previous_<key>", with
+    their values from before the update. PostgreSQL reads and locks them in
+    a CTE of the same statement; other databases cannot return pre-update
+    values, so they are read just before the UPDATE.
+    """
+    options={"synchronize_session": False}
+    if previous and dialect_name(db)=="postgresql":
+        before=select(model.id, *previous).where(*where).with_for_update().cte("previous")
+        stmt=(
+            update(model).where(model.id==before.c.id).values(values)
+            .returning(*returning, *(before.c[column.key].label(f"previous_{column.key}") for column in previous))
+        )
+        row=db.execute(stmt, execution_options=options).first()
+        return dict(row._mapping) if row else None
+
+    before={}
+    if previous:
+        row=db.execute(select(*previous).where(*where)).first()
+        if row is None:
+            return None
+        before={f"previous_{key}": value for key, value in row._mapping.items()}
+    row=db.execute(update(model).where(*where).values(values).returning(*returning), execution_options=options).first()
+    return {**row._mapping, **before} if row else None
+
+
+class AdvisoryLock:
+    """A session-level PostgreSQL advisory lock held on a dedicated connection.
+
+    Only one process can hold `key` at a time, and the lock goes away with
+    its connection, so another process takes over when the holder dies.
+    Other databases have no advisory locks and are assumed to run a single
+    process: acquire() always succeeds there.
+    """
+
+    def __init__(self, engine: Engine, key: int):
+        self.engine=engine
+        self.key=key
+        self._connection: Optional[Connection]=None
+
+    def acquire(self) -> bool:
+        """Take the lock if it is free; True while this process holds it."""
+        if self.engine.dialect.name!="postgresql":
+            return True
+        if self._connection is not None:
+            try:
+                self._connection.exec_driver_sql("SELECT 1")
+                self._connection.commit()
+                return True
+            except Exception:
+                logger.warning("Lost the connection holding advisory lock %d", self.key)
+                self._connection.invalidate()
+                self._connection=None
+
+        connection=self.engine.connect()
+        acquired=connection.scalar(select(func.pg_try_advisory_lock(self.key)))
+        connection.commit()
+        if not acquired:
+            connection.close()
+            return False
+        self._connection=connection
+        return True
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.scalar(select(func.pg_advisory_unlock(self.key)))
+            self._connection.commit()
+            self._connection.close()
+        except Exception:
+            # An invalidated connection is discarded, and the lock with it.
+            self._connection.invalidate()
+        self._connection=None
@@ -0,0 +1,32 @@
+"""add task keyset pagination index
+
+Revision ID: 3f9c1d2b7a41
+Revises: aa39c0a4aaab
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d2b7a41'
+down_revision: Union[str, Sequence[str], None] = 'aa39c0a4aaab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY builds without blocking writes but cannot run inside a
+    # transaction. If a build fails it leaves an INVALID index behind; drop it
+    # before running the upgrade again.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_owner_id_id', 'tasks', ['owner_id', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_owner_id_id', table_name='tasks', postgresql_concurrently=True)
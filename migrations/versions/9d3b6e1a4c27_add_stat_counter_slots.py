@@ -0,0 +1,46 @@
+"""add stat counter slots
+
+Revision ID: 9d3b6e1a4c27
+Revises: c7f2a8e4b913
+Create Date: 2026-10-18 23:05:12.904318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6e1a4c27'
+down_revision: Union[str, Sequence[str], None] = 'c7f2a8e4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing counters become slot 0; stat_counters is small, so rebuilding
+    # its primary key is quick.
+    op.add_column('stat_counters', sa.Column('slot', sa.Integer(), server_default='0', nullable=False))
+    op.drop_constraint('stat_counters_pkey', 'stat_counters', type_='primary')
+    op.create_primary_key('stat_counters_pkey', 'stat_counters', ['scope', 'bucket', 'slot'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold every slot back into slot 0 before dropping the column.
+    op.execute("""
+        UPDATE stat_counters AS c SET value = s.total
+        FROM (SELECT scope, bucket, sum(value) AS total FROM stat_counters GROUP BY scope, bucket) AS s
+        WHERE c.scope = s.scope AND c.bucket = s.bucket AND c.slot = 0
+    """)
+    op.execute("""
+        INSERT INTO stat_counters (scope, bucket, slot, value)
+        SELECT scope, bucket, 0, sum(value) FROM stat_counters GROUP BY scope, bucket
+        HAVING NOT bool_or(slot = 0)
+    """)
+    op.execute("DELETE FROM stat_counters WHERE slot <> 0")
+    op.drop_constraint('stat_counters_pkey', 'stat_counters', type_='primary')
+    op.create_primary_key('stat_counters_pkey', 'stat_counters', ['scope', 'bucket'])
+    op.drop_column('stat_counters', 'slot')
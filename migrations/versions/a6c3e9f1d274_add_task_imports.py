@@ -0,0 +1,58 @@
+"""add task imports
+
+Revision ID: a6c3e9f1d274
+Revises: f2b9d4a6c810
+Create Date: 2026-10-18 20:05:51.627340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3e9f1d274'
+down_revision: Union[str, Sequence[str], None] = 'f2b9d4a6c810'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_imports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='taskimportstatus'), nullable=False),
+        sa.Column('rows_processed', sa.Integer(), nullable=False),
+        sa.Column('rows_imported', sa.Integer(), nullable=False),
+        sa.Column('rows_failed', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_imports_id'), 'task_imports', ['id'], unique=False)
+    op.create_index(op.f('ix_task_imports_owner_id'), 'task_imports', ['owner_id'], unique=False)
+    op.create_table('task_import_errors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('import_id', sa.Integer(), nullable=False),
+        sa.Column('line', sa.Integer(), nullable=False),
+        sa.Column('detail', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['import_id'], ['task_imports.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_import_errors_import_id_id', 'task_import_errors', ['import_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_import_errors_import_id_id', table_name='task_import_errors')
+    op.drop_table('task_import_errors')
+    op.drop_index(op.f('ix_task_imports_owner_id'), table_name='task_imports')
+    op.drop_index(op.f('ix_task_imports_id'), table_name='task_imports')
+    op.drop_table('task_imports')
+    sa.Enum(name='taskimportstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,44 @@
+"""add task search indexes
+
+Revision ID: b7e4a9c0d352
+Revises: 3f9c1d2b7a41
+Create Date: 2026-10-18 10:03:27.561930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a9c0d352'
+down_revision: Union[str, Sequence[str], None] = '3f9c1d2b7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Indexed as an expression rather than a STORED generated column: adding that
+# column rewrites the whole table under an ACCESS EXCLUSIVE lock. Queries must
+# repeat the expression exactly (see app/services/search_service.py).
+SEARCH_VECTOR="to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY builds without blocking writes but cannot run inside a
+    # transaction. If a build fails it leaves an INVALID index behind; drop it
+    # before running the upgrade again.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_search_vector', 'tasks', [sa.text(SEARCH_VECTOR)], postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_tasks_title_trgm', 'tasks', ['title'], postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_tasks_description_trgm', 'tasks', ['description'], postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_description_trgm', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_title_trgm', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""add stat counters
+
+Revision ID: c41d8e5f2a90
+Revises: b7e4a9c0d352
+Create Date: 2026-10-18 11:20:05.347712
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e5f2a90'
+down_revision: Union[str, Sequence[str], None] = 'b7e4a9c0d352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stat_counters',
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('bucket', sa.String(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'bucket')
+    )
+    # Backfill from the existing rows; afterwards the services keep them current.
+    op.execute("""
+        INSERT INTO stat_counters (scope, bucket, value)
+        SELECT 'users_by_status', CAST(status AS VARCHAR), count(*) FROM users GROUP BY status
+        UNION ALL
+        SELECT 'tasks_by_status', CAST(status AS VARCHAR), count(*) FROM tasks GROUP BY status
+        UNION ALL
+        SELECT 'tasks_by_category', CAST(category AS VARCHAR), count(*) FROM tasks GROUP BY category
+        UNION ALL
+        SELECT 'tasks_by_owner', CAST(owner_id AS VARCHAR), count(*) FROM tasks WHERE owner_id IS NOT NULL GROUP BY owner_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stat_counters')
@@ -0,0 +1,42 @@
+"""add task deadline scheduler
+
+Revision ID: c7f2a8e4b913
+Revises: b3e8d1f6a592
+Create Date: 2026-10-18 22:31:47.512804
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f2a8e4b913'
+down_revision: Union[str, Sequence[str], None] = 'b3e8d1f6a592'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_deadline_watermarks',
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('fire_at', sa.DateTime(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('kind')
+    )
+    # See e83b0c6d4f17 for why CONCURRENTLY needs an autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_open_due_date_id', 'tasks', ['due_date', 'id'], unique=False,
+            postgresql_where=sa.text("status <> 'DONE' AND due_date IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_open_due_date_id', table_name='tasks', postgresql_concurrently=True)
+    op.drop_table('task_deadline_watermarks')
@@ -0,0 +1,32 @@
+"""add task versions
+
+Revision ID: d5a2f7c81b36
+Revises: c41d8e5f2a90
+Create Date: 2026-10-18 14:02:41.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a2f7c81b36'
+down_revision: Union[str, Sequence[str], None] = 'c41d8e5f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('tasks_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'tasks_version')
+    op.drop_column('tasks', 'version')
+    op.drop_column('tasks', 'updated_at')
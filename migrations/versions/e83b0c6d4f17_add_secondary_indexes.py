@@ -0,0 +1,37 @@
+"""add secondary indexes
+
+Revision ID: e83b0c6d4f17
+Revises: d5a2f7c81b36
+Create Date: 2026-10-18 15:36:12.604281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b0c6d4f17'
+down_revision: Union[str, Sequence[str], None] = 'd5a2f7c81b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY builds without blocking writes but cannot run inside a
+    # transaction. If a build fails it leaves an INVALID index behind; drop it
+    # before running the upgrade again.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_status_id', 'tasks', ['status', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_users_status'), 'users', ['status'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_users_role_id'), 'users', ['role_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_users_role_id'), table_name='users', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_users_status'), table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_status_id', table_name='tasks', postgresql_concurrently=True)
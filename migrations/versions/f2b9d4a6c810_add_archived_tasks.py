@@ -0,0 +1,54 @@
+"""add archived tasks
+
+Revision ID: f2b9d4a6c810
+Revises: e83b0c6d4f17
+Create Date: 2026-10-18 18:42:17.093518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b9d4a6c810'
+down_revision: Union[str, Sequence[str], None] = 'e83b0c6d4f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The enum types already exist; they belong to tasks.
+    task_status_enum = postgresql.ENUM('TODO', 'IN_PROGRESS', 'DONE', name='taskstatus', create_type=False)
+    task_category_enum = postgresql.ENUM('WORK', 'PERSONAL', 'STUDY', 'OTHER', name='taskcategory', create_type=False)
+    op.create_table('archived_tasks',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('status', task_status_enum, nullable=False),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('category', task_category_enum, nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archived_tasks_owner_id_id', 'archived_tasks', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived rows go back into tasks before the table is dropped.
+    op.execute("""
+        INSERT INTO tasks (id, title, description, status, due_date, created_at, updated_at, version, category, owner_id)
+        SELECT id, title, description, status, due_date, created_at, updated_at, version, category, owner_id
+        FROM archived_tasks
+    """)
+    op.drop_index('ix_archived_tasks_owner_id_id', table_name='archived_tasks')
+    op.drop_table('archived_tasks')
@@ -0,0 +1,413 @@
+"""Reproducible benchmarks for the service layer, serialization and HTTP routes.
+
+    python -m scripts.bench --sqlite /tmp/bench.db --output before.json
+    python -m scripts.bench --sqlite /tmp/bench.db --output after.json --compare before.json
+
+Routes are driven in-process through the ASGI interface, so no server or
+external service is needed. With --sqlite the database is created and
+seeded from scratch; without it the configured DATABASE_URL is used and
+must already be migrated (it is seeded only when it has no tasks).
+
+Results are written as JSON. With --compare, latency percentiles and
+throughput are checked against a previous run, and the exit status is 1 if
+any of them regressed by more than --threshold. The exit status is also 1
+if a listing issues more SQL statements for a large page than for a small
+one (an N+1 regression).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlencode
+
+BENCH_ADMIN_EMAIL="bench-admin@example.com"
+
+
+def _percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index=min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    values=sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(_percentile(values, 50) * 1000, 3),
+        "p95_ms": round(_percentile(values, 95) * 1000, 3),
+        "p99_ms": round(_percentile(values, 99) * 1000, 3),
+    }
+
+
+# ---------------------------------------------------------------- setup
+
+def _prepare(args) -> dict:
+    """Seed the database if needed and return ids the benchmarks work on."""
+    from sqlalchemy import func, select
+    from app.database import Base, SessionLocal, engine
+    from app.models.database_models import Role, Task, User, UserStatus
+    from app.utils.hashing import pwd_context
+    from scripts.seed_data import SEED_PASSWORD, seed
+
+    if args.sqlite:
+        Base.metadata.create_all(engine)
+
+    with SessionLocal() as db:
+        if not db.scalar(select(func.count()).select_from(Task)):
+            seed(db, args.users, args.tasks_per_user, args.seed)
+
+        if db.scalar(select(User.id).where(User.email==BENCH_ADMIN_EMAIL)) is None:
+            admin_role=db.scalar(select(Role).where(Role.name=="admin")) or Role(name="admin")
+            db.add(User(
+                email=BENCH_ADMIN_EMAIL, full_name="Bench Admin", hashed_password=pwd_context.hash(SEED_PASSWORD),
+                role=admin_role, status=UserStatus.ACTIVE,
+            ))
+            db.commit()
+
+        owner_id=db.scalar(select(Task.owner_id).group_by(Task.owner_id).order_by(func.count().desc()).limit(1))
+        return {
+            "owner_email": db.get(User, owner_id).email,
+            "owner_id": owner_id,
+            "task_id": db.scalar(select(Task.id).where(Task.owner_id==owner_id).order_by(Task.id).limit(1)),
+            "password": SEED_PASSWORD,
+            "users": db.scalar(select(func.count()).select_from(User)),
+            "tasks": db.scalar(select(func.count()).select_from(Task)),
+        }
+
+
+# ---------------------------------------------------------------- micro-benchmarks
+
+def _time_calls(fn: Callable[[], Any], iterations: int) -> dict:
+    fn()  # warm-up: lazy imports, first-connection setup, compiled-statement cache
+    latencies=[]
+    started=time.perf_counter()
+    for _ in range(iterations):
+        start=time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return _summarize(latencies, time.perf_counter() - started)
+
+
+_adapters: dict={}
+
+
+def _response_model_json(annotation, value) -> bytes:
+    """What FastAPI does for `response_model=...`: validate, dump to JSON-able data, json.dumps."""
+    from pydantic import TypeAdapter
+    adapter=_adapters.get(annotation) or _adapters.setdefault(annotation, TypeAdapter(annotation))
+    data=adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def run_micro(ctx: dict, iterations: int) -> dict:
+    from app.database import SessionLocal
+    from app.models.database_models import TaskStatus
+    from app.models.task import TaskOut
+    from app.models.user import UserOut
+    from app.services.task_service import TaskService
+    from app.services.user_service import UserService
+    from app.utils.fieldsets import parse_task_fieldset
+    from app.utils.security import load_principal
+    from app.utils.serialization import task_list_json, user_list_json
+
+    db=SessionLocal()
+    try:
+        owner=load_principal(db, ctx["owner_email"])
+        tasks=TaskService.get_user_tasks(db, owner, 50, 0)
+        users=UserService.get_all_users(db, limit=100)
+        sparse=parse_task_fieldset("id,title,status", None)
+
+        def with_session(call):
+            def run():
+                with SessionLocal() as session:
+                    call(session)
+            return run
+
+        benchmarks={
+            "TaskService.get_user_tasks": with_session(lambda s: TaskService.get_user_tasks(s, owner, 20, 0)),
+            "TaskService.get_user_tasks(fields=id,title,status)": with_session(lambda s: TaskService.get_user_tasks(s, owner, 20, 0, fieldset=sparse)),
+            "TaskService.get_all_tasks(status)": with_session(lambda s: TaskService.get_all_tasks(s, status=TaskStatus.DONE, limit=20)),
+            "TaskService.get_all_tasks(search)": with_session(lambda s: TaskService.get_all_tasks(s, search="review", limit=20)),
+            "TaskService.get_task": with_session(lambda s: TaskService.get_task(ctx["task_id"], s, owner)),
+            "TaskService._summary (uncached)": with_session(lambda s: TaskService._summary(s, owner.id, 5)),
+            "UserService.get_all_users": with_session(lambda s: UserService.get_all_users(s, limit=100)),
+            "UserService.get_admin_data": with_session(UserService.get_admin_data),
+            "UserService.get_user_stats": with_session(lambda s: UserService.get_user_stats(s, ctx["owner_id"])),
+            "security.load_principal (principal cache)": with_session(lambda s: load_principal(s, ctx["owner_email"])),
+            "TaskOut page of 50 (model_validate + model_dump_json)": lambda: [TaskOut.model_validate(t).model_dump_json() for t in tasks],
+            "TaskOut page of 50 (response_model path)": lambda: _response_model_json(list[TaskOut], tasks),
+            "TaskOut page of 50 (task_list_json)": lambda: task_list_json(tasks),
+            "TaskOut page of 50 (task_list_json, fields=id,title,status)": lambda: task_list_json(tasks, sparse),
+            "UserOut page of 100 (model_validate + model_dump_json)": lambda: [UserOut.model_validate(u).model_dump_json() for u in users],
+            "UserOut page of 100 (response_model path)": lambda: _response_model_json(list[UserOut], users),
+            "UserOut page of 100 (user_list_json)": lambda: user_list_json(users),
+        }
+        results={}
+        for name, fn in benchmarks.items():
+            results[name]=_time_calls(fn, iterations)
+            print(f"  {name:<60} p50 {results[name]['p50_ms']:>9.3f} ms")
+        return results
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------- query counts
+
+QUERY_CHECK_PAGE_SIZES=(1, 100)
+
+
+def check_query_counts(ctx: dict) -> tuple[dict, list[str]]:
+    """Statements per listing call, which must not grow with the page size."""
+    from app.database import SessionLocal, engine
+    from app.services.task_service import TaskService
+    from app.services.user_service import UserService
+    from app.utils.fieldsets import parse_task_fieldset
+    from app.utils.query_counter import assert_max_queries, count_queries
+    from app.utils.security import load_principal
+
+    with SessionLocal() as db:
+        owner=load_principal(db, ctx["owner_email"])
+    sparse=parse_task_fieldset("id,title,status", None)
+    listings={
+        "TaskService.get_all_tasks": lambda s, n: TaskService.get_all_tasks(s, limit=n),
+        "TaskService.get_all_tasks(fields=id,title,status)": lambda s, n: TaskService.get_all_tasks(s, limit=n, fieldset=sparse),
+        "TaskService.get_all_tasks(include_archived)": lambda s, n: TaskService.get_all_tasks(s, limit=n, include_archived=True),
+        "TaskService.get_user_tasks": lambda s, n: TaskService.get_user_tasks(s, owner, n, 0),
+        "UserService.get_all_users": lambda s, n: UserService.get_all_users(s, limit=n),
+    }
+    small, large=QUERY_CHECK_PAGE_SIZES
+    results, failures={}, []
+    for name, call in listings.items():
+        with SessionLocal() as db, count_queries(engine) as counter:
+            call(db, small)
+        try:
+            with SessionLocal() as db, assert_max_queries(counter.count, engine) as large_counter:
+                call(db, large)
+        except AssertionError as exc:
+            failures.append(f"{name}: limit={large} {exc}")
+        results[name]={f"limit={small}": counter.count, f"limit={large}": large_counter.count}
+        print(f"  {name:<60} {counter.count} -> {large_counter.count} statements")
+    return results, failures
+
+
+# ---------------------------------------------------------------- ASGI load driver
+
+async def _asgi_request(app, method: str, url: str, headers: dict=None, body: bytes=b"") -> tuple[int, bytes]:
+    path, _, query=url.partition("?")
+    scope={
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"bench")] + [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    request_sent=False
+    status=0
+    chunks: list[bytes]=[]
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent=True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        nonlocal status
+        if message["type"]=="http.response.start":
+            status=message["status"]
+        elif message["type"]=="http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def _login(app, email: str, password: str) -> dict:
+    status, body=await _asgi_request(
+        app, "POST", "/login", {"content-type": "application/x-www-form-urlencoded"},
+        urlencode({"username": email, "password": password}).encode(),
+    )
+    if status!=200:
+        sys.exit(f"Login as {email} failed with {status}: {body[:200]!r}")
+    return {"authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+
+async def _drive(request: Callable[[], Awaitable[int]], total: int, concurrency: int) -> dict:
+    latencies: list[float]=[]
+    errors=0
+    remaining=total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining-=1
+            start=time.perf_counter()
+            status=await request()
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors+=1
+
+    started=time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run_routes(ctx: dict, requests: int, concurrency: int) -> dict:
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        user=await _login(app, ctx["owner_email"], ctx["password"])
+        admin=await _login(app, BENCH_ADMIN_EMAIL, ctx["password"])
+        login_form=urlencode({"username": ctx["owner_email"], "password": ctx["password"]}).encode()
+        json_headers={**user, "content-type": "application/json"}
+
+        async def call(method, url, headers, body=b""):
+            status, _=await _asgi_request(app, method, url, headers, body)
+            return status
+
+        routes={
+            "GET /": lambda: call("GET", "/", {}),
+            "POST /login": lambda: call("POST", "/login", {"content-type": "application/x-www-form-urlencoded"}, login_form),
+            "GET /my-tasks": lambda: call("GET", "/my-tasks?limit=20", user),
+            "GET /my-tasks/summary": lambda: call("GET", "/my-tasks/summary", user),
+            "GET /tasks/{id}": lambda: call("GET", f"/tasks/{ctx['task_id']}", user),
+            "PATCH /tasks/{id}": lambda: call("PATCH", f"/tasks/{ctx['task_id']}", json_headers, b'{"description": "bench"}'),
+            "POST /tasks": lambda: call("POST", "/tasks", json_headers, b'{"title": "bench task"}'),
+            "GET /tasks": lambda: call("GET", "/tasks?limit=20", admin),
+            "GET /tasks?fields": lambda: call("GET", "/tasks?limit=20&fields=id,title,status", admin),
+            "GET /tasks?search": lambda: call("GET", "/tasks?limit=20&search=review", admin),
+            "GET /admin/stats": lambda: call("GET", "/admin/stats", admin),
+            "GET /admin/users": lambda: call("GET", "/admin/users?limit=50", admin),
+            "GET /admin/users/{id}/stats": lambda: call("GET", f"/admin/users/{ctx['owner_id']}/stats", admin),
+        }
+        results={}
+        for name, request in routes.items():
+            # bcrypt makes /login orders of magnitude slower; keep its run short.
+            count=max(concurrency, requests // 20) if name=="POST /login" else requests
+            await request()
+            results[name]=await _drive(request, count, concurrency)
+            r=results[name]
+            print(f"  {name:<30} {r['throughput']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}  p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  errors {r['errors']}")
+        return results
+
+
+# ---------------------------------------------------------------- comparison
+
+# section -> {metric: True when a higher value is worse}. Micro-benchmarks are
+# compared on the median only; their tails are dominated by GC and scheduler noise.
+COMPARED_METRICS={
+    "micro": {"p50_ms": True},
+    "routes": {"p50_ms": True, "p95_ms": True, "throughput": False},
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions=[]
+    for section, metrics in COMPARED_METRICS.items():
+        for name, now in current.get(section, {}).items():
+            before=baseline.get(section, {}).get(name)
+            if not before:
+                continue
+            for metric, higher_is_worse in metrics.items():
+                if metric not in now or not before.get(metric):
+                    continue
+                change=(now[metric] - before[metric]) / before[metric]
+                if (change if higher_is_worse else -change) > threshold:
+                    regressions.append(f"{section} {name}: {metric} {before[metric]} -> {now[metric]} ({change:+.0%})")
+    return regressions
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sqlite", metavar="PATH", help="benchmark against a fresh SQLite database at PATH")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tasks-per-user", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=200, help="calls per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-routes", action="store_true")
+    parser.add_argument("--skip-queries", action="store_true")
+    parser.add_argument("--output", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="previous results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change counted as a regression")
+    args=parser.parse_args()
+
+    if args.sqlite:
+        if os.path.exists(args.sqlite):
+            os.remove(args.sqlite)
+        # Must be set before the app modules create their engines.
+        os.environ["DATABASE_URL"]=f"sqlite:///{os.path.abspath(args.sqlite)}"
+
+    from app.core.config import settings
+    from app.database import engine
+
+    print(f"Preparing {engine.dialect.name} database...")
+    ctx=_prepare(args)
+    results: dict[str, Any]={
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": engine.dialect.name,
+            "users": ctx["users"],
+            "tasks": ctx["tasks"],
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "concurrency": args.concurrency,
+        },
+    }
+
+    query_failures=[]
+    if not args.skip_queries:
+        print("Query counts:")
+        results["queries"], query_failures=check_query_counts(ctx)
+    if not args.skip_micro:
+        print("Micro-benchmarks:")
+        results["micro"]=run_micro(ctx, args.iterations)
+    if not args.skip_routes:
+        print("Routes:")
+        results["routes"]=asyncio.run(run_routes(ctx, args.requests, args.concurrency))
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results written to {args.output}")
+
+    if query_failures:
+        print("Statement counts that grow with the page size:")
+        for line in query_failures:
+            print(f"  {line}")
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions=compare(json.load(fh), results, args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}.")
+    if query_failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""EXPLAIN the SQL behind the task and user services; fail on sequential scans.
+
+    python -m scripts.seed_data --users 2000 --tasks-per-user 50
+    python -m scripts.explain_check [--verbose]
+
+Each scenario calls the real service methods inside a transaction that is
+rolled back afterwards, capturing every statement they send. Each captured
+statement is then explained with enable_seqscan=off, so a Seq Scan still in
+the plan means no index can serve that query, whatever the table size.
+Exits with status 1 if any such plan is found. The check needs PostgreSQL;
+on other databases the plans are only printed.
+"""
+import argparse
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+from fastapi import HTTPException
+from sqlalchemy import event, func, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.database import engine
+from app.models.database_models import Task, TaskStatus, User, UserStatus
+from app.models.task import TaskCreate, TaskUpdate
+from app.models.user import UserCreate
+from app.services.task_archive_service import TaskArchiveService
+from app.services.task_batch_service import TaskBatchService
+from app.services.task_deadlines import TaskDeadlines
+from app.services.task_service import TaskService
+from app.services.user_service import UserService
+from app.utils.fieldsets import parse_task_fieldset
+from app.utils.pagination import encode_cursor
+from app.utils.roles import RoleRegistry
+from app.utils.security import Principal, load_principal
+
+# Lookup tables with a handful of rows, where a sequential scan is the best plan.
+SEQ_SCAN_ALLOWED={"roles", "task_deadline_watermarks"}
+
+EXPLAINABLE=("select", "insert", "update", "delete", "with")
+
+
+@dataclass
+class Sample:
+    owner: Principal
+    admin: Principal
+    task_id: int
+    user_id: int
+
+
+def _sample(db: Session) -> Sample:
+    owner_id=db.scalar(
+        select(Task.owner_id).group_by(Task.owner_id).order_by(func.count().desc()).limit(1)
+    )
+    if owner_id is None:
+        sys.exit("No tasks found; run `python -m scripts.seed_data` first.")
+    owner=load_principal(db, db.get(User, owner_id).email)
+    task_id=db.scalar(select(Task.id).where(Task.owner_id==owner_id).order_by(Task.id).limit(1))
+    admin=Principal(id=0, email="explain-check@localhost", full_name=None, role_name="admin", status=UserStatus.ACTIVE)
+    return Sample(owner=owner, admin=admin, task_id=task_id, user_id=owner_id)
+
+
+def _task_lifecycle(db: Session, s: Sample) -> None:
+    task=TaskService.create_task(TaskCreate(title="explain check"), db, s.owner)
+    TaskService.update_task(db, s.owner, task.id, TaskUpdate(status=TaskStatus.DONE))
+    TaskService.delete_task(db, task.id, s.owner)
+
+
+def _login_lookup(db: Session, s: Sample) -> None:
+    # An unknown email stops after the lookup, before bcrypt runs; the
+    # statement is the same one a real login sends.
+    try:
+        UserService.login(db, "explain-check@localhost", "explain-check")
+    except HTTPException:
+        pass
+
+
+def _register(db: Session, s: Sample) -> None:
+    # A new email runs the existence check and the INSERT ... ON CONFLICT; the
+    # taken one stops at the existence check, before any hashing.
+    UserService.register(db, UserCreate(email="explain-check@example.com", password="explain-check"))
+    try:
+        UserService.register(db, UserCreate(email=s.owner.email, password="explain-check"))
+    except HTTPException:
+        pass
+
+
+def _process_user(approve: bool) -> Callable[[Session, Sample], None]:
+    def scenario(db: Session, s: Sample) -> None:
+        # Only pending users can be processed; the rollback restores the status.
+        db.execute(update(User).where(User.id==s.user_id).values(status=UserStatus.PENDING))
+        UserService.process_user(db, s.user_id, approve)
+    return scenario
+
+
+def _batch_lifecycle(db: Session, s: Sample) -> None:
+    created=TaskBatchService.create_tasks(db, [{"title": "explain check"}, {"title": "explain check 2"}], s.owner)
+    ids=[result.id for result in created["results"]]
+    TaskBatchService.update_tasks(db, [{"id": s.task_id, "status": "DONE"}] + [{"id": id, "title": "renamed"} for id in ids], s.owner)
+    TaskBatchService.delete_tasks(db, ids + [s.task_id], s.owner)
+
+
+SCENARIOS: list[tuple[str, Callable[[Session, Sample], object]]]=[
+    ("TaskService.get_all_tasks", lambda db, s: TaskService.get_all_tasks(db)),
+    ("TaskService.get_all_tasks(status)", lambda db, s: TaskService.get_all_tasks(db, status=TaskStatus.DONE)),
+    ("TaskService.get_all_tasks(user_id)", lambda db, s: TaskService.get_all_tasks(db, user_id=s.user_id)),
+    ("TaskService.get_all_tasks(status, user_id)", lambda db, s: TaskService.get_all_tasks(db, status=TaskStatus.TODO, user_id=s.user_id)),
+    ("TaskService.get_all_tasks(cursor)", lambda db, s: TaskService.get_all_tasks(db, cursor=encode_cursor(s.task_id))),
+    ("TaskService.get_all_tasks(search)", lambda db, s: TaskService.get_all_tasks(db, search="review")),
+    ("TaskService.get_all_tasks(fields)", lambda db, s: TaskService.get_all_tasks(db, fieldset=parse_task_fieldset("id,title,status", "owner"))),
+    ("TaskService.get_user_tasks", lambda db, s: TaskService.get_user_tasks(db, s.owner, 10, 0)),
+    ("TaskService.get_user_tasks(cursor)", lambda db, s: TaskService.get_user_tasks(db, s.owner, 10, 0, encode_cursor(s.task_id))),
+    ("TaskService.get_user_tasks(include_archived)", lambda db, s: TaskService.get_user_tasks(db, s.owner, 10, 0, include_archived=True)),
+    ("TaskService.get_user_tasks(fields)", lambda db, s: TaskService.get_user_tasks(db, s.owner, 10, 0, fieldset=parse_task_fieldset("id,title,status", None))),
+    ("TaskService.get_task", lambda db, s: TaskService.get_task(s.task_id, db, s.owner)),
+    ("TaskService._summary", lambda db, s: TaskService._summary(db, s.user_id, 5)),
+    ("TaskService.create/update/delete_task", _task_lifecycle),
+    ("TaskBatchService.create/update/delete_tasks", _batch_lifecycle),
+    ("TaskArchiveService.move_batch", lambda db, s: TaskArchiveService.move_batch(db, [Task.owner_id==s.user_id], 100)),
+    ("TaskDeadlines.load_window", lambda db, s: TaskDeadlines.load_window(db, datetime.now(timezone.utc).replace(tzinfo=None))),
+    ("UserService.register", _register),
+    ("UserService.login", _login_lookup),
+    ("UserService.get_all_users", lambda db, s: UserService.get_all_users(db)),
+    ("UserService.get_all_users(cursor)", lambda db, s: UserService.get_all_users(db, cursor=encode_cursor(s.user_id))),
+    ("UserService.get_pending_users", lambda db, s: UserService.get_pending_users(db)),
+    ("UserService.get_admin_data", lambda db, s: UserService.get_admin_data(db)),
+    ("UserService.get_user_stats", lambda db, s: UserService.get_user_stats(db, s.user_id)),
+    ("UserService.process_user(approve)", _process_user(True)),
+    ("UserService.process_user(reject)", _process_user(False)),
+    ("UserService.archive_user", lambda db, s: UserService.archive_user(db, s.user_id, s.admin)),
+    ("security.load_principal", lambda db, s: load_principal(db, s.owner.email)),
+    # admin_exists() is answered from memory once loaded; load() sends its queries.
+    ("RoleRegistry.load", lambda db, s: RoleRegistry.load(db)),
+]
+
+
+@contextmanager
+def _captured(connection: Connection) -> Iterator[list[tuple[str, object]]]:
+    statements: list[tuple[str, object]]=[]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().lower().startswith(EXPLAINABLE):
+            # executemany sends a list of parameter sets; batched INSERT ...
+            # RETURNING flags executemany but runs one set at a time.
+            statements.append((statement, parameters[0] if isinstance(parameters, list) else parameters))
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
+
+
+def _run(scenario: Callable[[Session, Sample], object], sample: Sample) -> list[tuple[str, object]]:
+    # Service commits only release a savepoint; the outer rollback undoes all writes.
+    with engine.connect() as connection:
+        transaction=connection.begin()
+        db=Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            with _captured(connection) as statements:
+                scenario(db, sample)
+        finally:
+            db.close()
+            transaction.rollback()
+    return statements
+
+
+def _plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _explain_postgres(connection: Connection, statement: str, parameters) -> tuple[list[str], list[str]]:
+    plan=connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()[0]["Plan"]
+    nodes=list(_plan_nodes(plan))
+    lines=[f"{node['Node Type']} {node.get('Index Name') or node.get('Relation Name') or ''}".rstrip() for node in nodes]
+    scans=[
+        node.get("Relation Name") for node in nodes
+        if node["Node Type"]=="Seq Scan" and node.get("Relation Name") not in SEQ_SCAN_ALLOWED
+    ]
+    return lines, scans
+
+
+def _explain_other(connection: Connection, statement: str, parameters) -> tuple[list[str], list[str]]:
+    rows=connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows], []
+
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not just failing ones")
+    args=parser.parse_args()
+
+    is_postgres=engine.dialect.name=="postgresql"
+    explain=_explain_postgres if is_postgres else _explain_other
+
+    with Session(engine) as db:
+        sample=_sample(db)
+
+    failures=0
+    with engine.connect() as connection:
+        if is_postgres:
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        for name, scenario in SCENARIOS:
+            for statement, parameters in _run(scenario, sample):
+                lines, scans=explain(connection, statement, parameters)
+                if scans:
+                    failures+=1
+                if scans or args.verbose:
+                    status=f"SEQ SCAN on {', '.join(scans)}" if scans else "ok"
+                    print(f"[{status}] {name}\n    {' '.join(statement.split())}")
+                    for line in lines:
+                        print(f"      {line}")
+        connection.rollback()
+
+    if not is_postgres:
+        print(f"Plans printed only: the sequential-scan check needs PostgreSQL, not {engine.dialect.name}.")
+        return
+    if failures:
+        sys.exit(f"{failures} statement(s) need a sequential scan.")
+    print(f"All statements from {len(SCENARIOS)} scenarios are served by indexes.")
+
+
+if __name__ == "__main__":
+    main()
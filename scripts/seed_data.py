@@ -0,0 +1,103 @@
+"""Fill a migrated database with synthetic users and tasks.
+
+    python -m scripts.seed_data --users 2000 --tasks-per-user 50
+
+Seeded users are ACTIVE with the role "user" and the password "password";
+their tasks get a realistic mix of statuses, categories and due dates. The
+stat counters are rebuilt afterwards and, on PostgreSQL, the tables are
+analyzed so the planner sees the new row counts.
+"""
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.models.database_models import Role, Task, TaskCategory, TaskStatus, User, UserStatus
+from app.services.stats_service import StatsService
+from app.utils.hashing import pwd_context
+
+SEED_PASSWORD="password"
+CHUNK_SIZE=5000
+
+STATUS_WEIGHTS={TaskStatus.TODO: 5, TaskStatus.IN_PROGRESS: 2, TaskStatus.DONE: 8}
+WORDS=("design", "review", "deploy", "invoice", "groceries", "exam", "report", "meeting", "refactor", "dentist")
+
+
+def _role_id(db: Session, name: str) -> int:
+    role_id=db.scalar(select(Role.id).where(Role.name==name))
+    if role_id is None:
+        role_id=db.execute(insert(Role).values(name=name).returning(Role.id)).scalar_one()
+    return role_id
+
+
+def _task_rows(owner_ids: list[int], tasks_per_user: int, rng: random.Random):
+    now=datetime.now(timezone.utc)
+    statuses, weights=zip(*STATUS_WEIGHTS.items())
+    for owner_id in owner_ids:
+        for _ in range(rng.randint(0, tasks_per_user * 2)):
+            title=" ".join(rng.sample(WORDS, 2))
+            yield {
+                "title": title,
+                "description": f"{title} #{rng.randint(1, 10**6)}" if rng.random() < 0.7 else None,
+                "status": rng.choices(statuses, weights)[0],
+                "category": rng.choice(list(TaskCategory)),
+                "due_date": now + timedelta(hours=rng.randint(-500, 2000)) if rng.random() < 0.4 else None,
+                "owner_id": owner_id,
+            }
+
+
+def _insert_chunked(db: Session, table, rows) -> None:
+    chunk=[]
+    for row in rows:
+        chunk.append(row)
+        if len(chunk)==CHUNK_SIZE:
+            db.execute(insert(table), chunk)
+            chunk=[]
+    if chunk:
+        db.execute(insert(table), chunk)
+
+
+def seed(db: Session, users: int, tasks_per_user: int, seed: int = 0) -> None:
+    rng=random.Random(seed)
+    role_id=_role_id(db, "user")
+    hashed_password=pwd_context.hash(SEED_PASSWORD)
+    prefix=f"seed-{uuid.uuid4().hex[:8]}"
+
+    _insert_chunked(db, User, (
+        {
+            "email": f"{prefix}-{i}@example.com",
+            "full_name": f"Seed User {i}",
+            "hashed_password": hashed_password,
+            "role_id": role_id,
+            "status": UserStatus.ACTIVE,
+        }
+        for i in range(users)
+    ))
+    owner_ids=db.scalars(select(User.id).where(User.email.like(f"{prefix}-%"))).all()
+    _insert_chunked(db, Task, _task_rows(owner_ids, tasks_per_user, rng))
+    db.commit()
+
+    StatsService.reconcile(db)
+    if db.get_bind().dialect.name=="postgresql":
+        db.execute(text("ANALYZE users, tasks, archived_tasks, stat_counters"))
+        db.commit()
+
+
+def main() -> None:
+    parser=argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=50, help="average; the actual count per user varies")
+    parser.add_argument("--seed", type=int, default=0)
+    args=parser.parse_args()
+
+    db=SessionLocal()
+    try:
+        seed(db, args.users, args.tasks_per_user, args.seed)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()